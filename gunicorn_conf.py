@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration for production deployments
+
+Usage: gunicorn -c gunicorn_conf.py app.main:app
+"""
+import os
+
+# Application code lives under src/
+pythonpath = "src"
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Single worker by default: the UDP receiver, realtime AI services, device
+# manager and MQTT client keep their state in-process, so extra workers each
+# get their own copy. Raise WORKERS only for stateless API deployments.
+workers = int(os.getenv("WORKERS", 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+keepalive = 5
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
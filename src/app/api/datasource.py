@@ -130,7 +130,7 @@ async def check_data_sources_health():
         return {
             "status": "success",
             "health_check": health_status,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": asyncio.get_running_loop().time()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
@@ -4,6 +4,8 @@ These functions are responsible for creating and providing various service insta
 Using FastAPI's `Depends` system can easily manage and mock these dependencies, making testing easier.
 """
 
+from fastapi import HTTPException, Request
+
 from app.services.ai_service import ai_service
 from app.services.mavlink_service import mavlink_service
 
@@ -16,3 +18,16 @@ def get_ai_service():
 def get_mavlink_service():
     """Get MAVLink service instance"""
     return mavlink_service
+
+
+def get_mqtt_service(request: Request):
+    """Get the MQTT service attached to the application at startup"""
+    return request.app.state.mqtt_service
+
+
+def get_mysql_manager(request: Request):
+    """Get the MySQL multi-source manager attached to the application at startup"""
+    manager = getattr(request.app.state, "mysql_manager", None)
+    if manager is None:
+        raise HTTPException(status_code=503, detail="MySQL is not enabled or failed to initialize")
+    return manager
@@ -1,10 +1,11 @@
 """
 MQTT API routes for managing MQTT service
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
 
-from app.services.mqtt_service import mqtt_service
+from app.api.deps import get_mqtt_service
+from app.services.mqtt_service import MQTTService
 from loguru import logger
 
 router = APIRouter(prefix="/mqtt", tags=["MQTT"])
@@ -14,7 +15,8 @@ router = APIRouter(prefix="/mqtt", tags=["MQTT"])
 async def start_mqtt_service(
     broker_host: Optional[str] = "221.226.33.58",
     broker_port: Optional[int] = 1883,
-    topic: Optional[str] = "/ue/device/mavlink"
+    topic: Optional[str] = "/ue/device/mavlink",
+    mqtt_service: MQTTService = Depends(get_mqtt_service)
 ):
     """
     Start MQTT service
@@ -42,7 +44,7 @@ async def start_mqtt_service(
 
 
 @router.post("/stop")
-async def stop_mqtt_service():
+async def stop_mqtt_service(mqtt_service: MQTTService = Depends(get_mqtt_service)):
     """
     Stop MQTT service
     
@@ -61,7 +63,7 @@ async def stop_mqtt_service():
 
 
 @router.get("/status")
-async def get_mqtt_status():
+async def get_mqtt_status(mqtt_service: MQTTService = Depends(get_mqtt_service)):
     """
     Get MQTT service status
     
@@ -76,7 +78,8 @@ async def get_mqtt_status():
 
 
 @router.post("/test-publish")
-async def test_mqtt_publish(message: str = "Test message from Model Control System"):
+async def test_mqtt_publish(message: str = "Test message from Model Control System",
+                            mqtt_service: MQTTService = Depends(get_mqtt_service)):
     """
     Test MQTT publishing
     
@@ -120,7 +123,7 @@ async def test_mqtt_publish(message: str = "Test message from Model Control Syst
 
 
 @router.get("/health")
-async def mqtt_health_check():
+async def mqtt_health_check(mqtt_service: MQTTService = Depends(get_mqtt_service)):
     """
     MQTT service health check
     
@@ -8,12 +8,18 @@ from pydantic import BaseModel
 from sqlalchemy import text
 from datetime import datetime
 
-from app.db.mysql_multi import mysql_manager, get_mysql_db, switch_mysql_source, get_current_mysql_source
+from app.api.deps import get_mysql_manager
+from app.db.mysql_multi import MySQLMultiSourceManager, get_mysql_db
 from app.models.mysql_models import Base, ALL_MODELS
 
 router = APIRouter(prefix="/mysql-datasource", tags=["MySQL数据源管理"])
 
 
+def _current_source_name(manager: MySQLMultiSourceManager) -> str:
+    """当前数据源名称，未设置时为unknown"""
+    return manager.current_source or "unknown"
+
+
 class DataSourceInfo(BaseModel):
     """数据源信息响应模型"""
     name: str
@@ -41,10 +47,10 @@ class QueryRequest(BaseModel):
 
 
 @router.get("/sources", response_model=Dict[str, DataSourceInfo])
-async def list_data_sources():
+async def list_data_sources(manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """列出所有可用的MySQL数据源"""
     try:
-        sources = mysql_manager.list_sources()
+        sources = manager.list_sources()
         return {
             name: DataSourceInfo(
                 name=name,
@@ -60,14 +66,14 @@ async def list_data_sources():
 
 
 @router.get("/current")
-async def get_current_data_source():
+async def get_current_data_source(manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """获取当前数据源信息"""
     try:
-        current_source = get_current_mysql_source()
+        current_source = _current_source_name(manager)
         if current_source == "unknown":
             raise HTTPException(status_code=404, detail="没有设置当前数据源")
         
-        sources = mysql_manager.list_sources()
+        sources = manager.list_sources()
         if current_source not in sources:
             raise HTTPException(status_code=404, detail=f"当前数据源 {current_source} 不存在")
         
@@ -85,10 +91,11 @@ async def get_current_data_source():
 
 
 @router.post("/switch")
-async def switch_data_source(request: SwitchDataSourceRequest):
+async def switch_data_source(request: SwitchDataSourceRequest,
+                             manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """切换数据源"""
     try:
-        await switch_mysql_source(request.source_name)
+        await manager.switch_source(request.source_name)
         return {
             "success": True,
             "message": f"成功切换到数据源: {request.source_name}",
@@ -101,11 +108,12 @@ async def switch_data_source(request: SwitchDataSourceRequest):
 
 
 @router.post("/test-connection")
-async def test_connection(source_name: Optional[str] = None):
+async def test_connection(source_name: Optional[str] = None,
+                          manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """测试数据库连接"""
     try:
-        target_source = source_name or get_current_mysql_source()
-        is_connected = await mysql_manager.test_connection(target_source)
+        target_source = source_name or _current_source_name(manager)
+        is_connected = await manager.test_connection(target_source)
         
         return {
             "source_name": target_source,
@@ -118,10 +126,11 @@ async def test_connection(source_name: Optional[str] = None):
 
 
 @router.post("/create-tables")
-async def create_tables(request: CreateTablesRequest):
+async def create_tables(request: CreateTablesRequest,
+                        manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """在指定数据源中创建表"""
     try:
-        target_source = request.source_name or get_current_mysql_source()
+        target_source = request.source_name or _current_source_name(manager)
         
         if target_source == "unknown":
             raise HTTPException(status_code=400, detail="没有指定数据源")
@@ -131,7 +140,7 @@ async def create_tables(request: CreateTablesRequest):
             raise HTTPException(status_code=400, detail=f"不支持的表类型: {request.table_type}")
         
         models = ALL_MODELS[request.table_type]
-        engine = mysql_manager.get_engine(target_source)
+        engine = manager.get_engine(target_source)
         
         # 创建表
         async with engine.begin() as conn:
@@ -153,10 +162,11 @@ async def create_tables(request: CreateTablesRequest):
 
 
 @router.post("/execute-sql")
-async def execute_sql(request: QueryRequest):
+async def execute_sql(request: QueryRequest,
+                      manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """执行原生SQL查询"""
     try:
-        target_source = request.source_name or get_current_mysql_source()
+        target_source = request.source_name or _current_source_name(manager)
         
         if target_source == "unknown":
             raise HTTPException(status_code=400, detail="没有指定数据源")
@@ -170,7 +180,7 @@ async def execute_sql(request: QueryRequest):
                 raise HTTPException(status_code=403, detail=f"禁止执行包含 {keyword} 的SQL语句")
         
         # 执行SQL
-        result = await mysql_manager.execute_raw_sql(request.sql, source_name=target_source)
+        result = await manager.execute_raw_sql(request.sql, source_name=target_source)
         
         return {
             "success": True,
@@ -187,10 +197,11 @@ async def execute_sql(request: QueryRequest):
 
 
 @router.get("/tables")
-async def list_tables(source_name: Optional[str] = None):
+async def list_tables(source_name: Optional[str] = None,
+                      manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """列出数据源中的所有表"""
     try:
-        target_source = source_name or get_current_mysql_source()
+        target_source = source_name or _current_source_name(manager)
         
         if target_source == "unknown":
             raise HTTPException(status_code=400, detail="没有指定数据源")
@@ -207,7 +218,7 @@ async def list_tables(source_name: Optional[str] = None):
         ORDER BY TABLE_NAME
         """
         
-        result = await mysql_manager.execute_raw_sql(sql, source_name=target_source)
+        result = await manager.execute_raw_sql(sql, source_name=target_source)
         
         tables = []
         for row in result:
@@ -220,7 +231,7 @@ async def list_tables(source_name: Optional[str] = None):
         
         return {
             "source_name": target_source,
-            "database": mysql_manager.data_sources[target_source]["database"],
+            "database": manager.data_sources[target_source]["database"],
             "table_count": len(tables),
             "tables": tables
         }
@@ -232,10 +243,11 @@ async def list_tables(source_name: Optional[str] = None):
 
 
 @router.get("/table/{table_name}/structure")
-async def get_table_structure(table_name: str, source_name: Optional[str] = None):
+async def get_table_structure(table_name: str, source_name: Optional[str] = None,
+                              manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """获取表结构信息"""
     try:
-        target_source = source_name or get_current_mysql_source()
+        target_source = source_name or _current_source_name(manager)
         
         if target_source == "unknown":
             raise HTTPException(status_code=400, detail="没有指定数据源")
@@ -251,11 +263,11 @@ async def get_table_structure(table_name: str, source_name: Optional[str] = None
             COLUMN_KEY as column_key,
             EXTRA as extra
         FROM INFORMATION_SCHEMA.COLUMNS 
-        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name
         ORDER BY ORDINAL_POSITION
         """
         
-        result = await mysql_manager.execute_raw_sql(sql, (table_name,), source_name=target_source)
+        result = await manager.execute_raw_sql(sql, {"table_name": table_name}, source_name=target_source)
         
         if not result:
             raise HTTPException(status_code=404, detail=f"表 {table_name} 不存在")
@@ -286,21 +298,21 @@ async def get_table_structure(table_name: str, source_name: Optional[str] = None
 
 
 @router.get("/health")
-async def health_check():
+async def health_check(manager: MySQLMultiSourceManager = Depends(get_mysql_manager)):
     """MySQL数据源健康检查"""
     try:
-        sources = mysql_manager.list_sources()
+        sources = manager.list_sources()
         health_status = {}
         
         for name, info in sources.items():
-            is_connected = await mysql_manager.test_connection(name)
+            is_connected = await manager.test_connection(name)
             health_status[name] = {
                 "database": info["database"],
                 "status": "healthy" if is_connected else "unhealthy",
                 "connected": is_connected
             }
         
-        current_source = get_current_mysql_source()
+        current_source = _current_source_name(manager)
         overall_status = "healthy" if current_source != "unknown" and health_status.get(current_source, {}).get("connected", False) else "unhealthy"
         
         return {
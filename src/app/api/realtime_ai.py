@@ -10,7 +10,7 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 import asyncio
-import json
+import orjson
 from datetime import datetime
 from loguru import logger
 
@@ -424,14 +424,12 @@ async def stream_results(service_id: str):
                         "processing_time_ms": result.processing_time_ms
                     }
                     
-                    # Format as SSE
-                    data = json.dumps(result_dict)
-                    yield f"data: {data}\n\n"
+                    # Format as SSE (orjson emits UTF-8 bytes, no str round-trip)
+                    yield b"data: " + orjson.dumps(result_dict) + b"\n\n"
                     
             except Exception as e:
                 logger.error(f"Error in result stream: {e}")
-                error_data = json.dumps({"error": str(e)})
-                yield f"data: {error_data}\n\n"
+                yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
         
         return StreamingResponse(
             generate_results(),
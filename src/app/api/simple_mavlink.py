@@ -17,7 +17,7 @@ parser = SimpleMavlinkParser()
 
 # In-memory storage for testing (HTTP API)
 http_messages: List[Dict] = []
-http_sessions: List[Dict] = []
+http_sessions: Dict[str, Dict] = {}  # session key -> session
 
 
 @router.post("/parse")
@@ -36,13 +36,13 @@ async def parse_mavlink_data(data: str, client_address: str = "test_client"):
             
             # Update or create session
             session_key = f"{message['system_id']}_{client_address}"
-            existing_session = next((s for s in http_sessions if s['key'] == session_key), None)
+            existing_session = http_sessions.get(session_key)
             
             if existing_session:
                 existing_session['last_seen'] = message['timestamp']
                 existing_session['message_count'] += 1
             else:
-                http_sessions.append({
+                http_sessions[session_key] = {
                     'key': session_key,
                     'system_id': message['system_id'],
                     'client_address': client_address,
@@ -50,7 +50,7 @@ async def parse_mavlink_data(data: str, client_address: str = "test_client"):
                     'last_seen': message['timestamp'],
                     'message_count': 1,
                     'is_active': True
-                })
+                }
             
             return {"status": "success", "message": message}
         else:
@@ -114,7 +114,7 @@ async def get_messages(limit: int = 100, source: str = "all"):
 async def get_sessions(source: str = "all"):
     """Get active MAVLink sessions from specified source"""
     if source == "http":
-        sessions = http_sessions
+        sessions = list(http_sessions.values())
     elif source == "udp":
         receiver = get_udp_receiver()
         sessions = receiver.get_sessions()
@@ -123,7 +123,7 @@ async def get_sessions(source: str = "all"):
         udp_sessions = receiver.get_sessions()
         # Merge sessions by key
         all_sessions = {}
-        for session in http_sessions + udp_sessions:
+        for session in list(http_sessions.values()) + udp_sessions:
             key = session['key']
             if key not in all_sessions:
                 all_sessions[key] = session
@@ -155,8 +155,8 @@ async def get_stats():
         },
         "udp_receiver": udp_stats,
         "combined": {
-            "total_messages": len(http_messages) + len(receiver.get_messages()),
-            "total_sessions": len(http_sessions) + len(receiver.get_sessions()),
+            "total_messages": len(http_messages) + udp_stats["stored_messages"],
+            "total_sessions": len(http_sessions) + udp_stats["active_sessions"],
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     }
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
@@ -41,10 +42,31 @@ class Settings(BaseSettings):
     MYSQL_TENANT_2_DB: str = "2_tenant"
     MYSQL_TENANT_3_DB: str = ""  # 空字符串表示未启用
     MYSQL_RUOYI_VUE_PRO_DB: str = ""  # 空字符串表示未启用
+    # 额外的MySQL数据源（JSON），例如 {"tenant_4": {"database": "4_tenant", "description": "租户4数据库"}}
+    MYSQL_EXTRA_SOURCES: Dict[str, Dict[str, str]] = {}
     
     # 默认MySQL数据库
     MYSQL_DEFAULT_DB: str = "2_tenant"
     
+    # MAVLink调试输出：开启后按采样间隔以DEBUG级别输出解析后的数据包
+    MAVLINK_DEBUG: bool = False
+    MAVLINK_DEBUG_SAMPLE_RATE: int = 10
+    
+    # MAVLink UDP接收套接字：内核接收缓冲区大小（受net.core.rmem_max限制），
+    # 以及是否开启SO_REUSEPORT（开启后多个进程可绑定同一端口，数据包会被内核分散到各进程）
+    MAVLINK_UDP_RCVBUF: int = 8 * 1024 * 1024
+    MAVLINK_UDP_REUSEPORT: bool = False
+    
+    # 是否将TCP接收器收到的每条MAVLink消息写入MongoDB（需同时开启USE_MONGO），默认不写入
+    MAVLINK_PERSIST_MESSAGES: bool = False
+    
+    # GPS批量发布主题：为空时每个GPS点单独发布到/ue/device/gps（保持原消息格式），
+    # 设置后改为将批量GPS点（{"gps_batch": [...], "count": N}）发布到该主题
+    MQTT_GPS_BATCH_TOPIC: str = ""
+    
+    # CORS允许的来源（JSON数组），例如 ["https://console.example.com"]
+    CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:2000", "http://127.0.0.1:2000"]
+    
     OPENAI_API_KEY: str = "dummy_key"
     OPENAI_API_BASE: str | None = None
     
@@ -73,6 +95,21 @@ class Settings(BaseSettings):
         """Analytics MongoDB连接URI"""
         return self.MONGO_URI
     
+    @property
+    def MYSQL_SOURCES(self) -> Dict[str, Dict[str, str]]:
+        """已启用的MySQL数据源表，数据库名为空的数据源不启用"""
+        sources = {
+            "tenant_2": {"database": self.MYSQL_TENANT_2_DB, "description": "租户2数据库"},
+            "tenant_3": {"database": self.MYSQL_TENANT_3_DB, "description": "租户3数据库"},
+            "ruoyi_vue_pro": {"database": self.MYSQL_RUOYI_VUE_PRO_DB, "description": "若依Vue Pro数据库"},
+            **self.MYSQL_EXTRA_SOURCES,
+        }
+        return {
+            name: {"description": name, **config}
+            for name, config in sources.items()
+            if config.get("database")
+        }
+    
     # Add environment variable validation
     def model_post_init(self, __context) -> None:
         if self.OPENAI_API_KEY == "dummy_key":
@@ -0,0 +1,60 @@
+"""
+Logging configuration
+
+All output goes through one queue drained by a background listener thread, so the
+event loop never blocks on stream I/O. Most modules use the stdlib logging module;
+those that log through loguru are routed into the same queue (loguru's default
+stderr sink is replaced by a handler that forwards to the stdlib root logger), so
+both share one formatter, one level and one writer thread.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+from loguru import logger as loguru_logger
+
+from app.core.constants import LOG_CONFIG
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s:%(funcName)s:%(lineno)d | %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _LoguruToLogging(logging.Handler):
+    """loguru sink that hands records to the stdlib logger of the same name"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def setup_logging(level: str = None) -> logging.handlers.QueueListener:
+    """Route all log records, stdlib and loguru, through a queue drained by a background thread
+
+    Handlers (stream formatting, encoding and flushing) run on the listener
+    thread, so logging calls on the event loop only enqueue the record.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level or LOG_CONFIG["level"])
+
+    # loguru records join the same queue; loguru filters by level itself since Logger.handle does not
+    loguru_logger.remove()
+    loguru_logger.add(_LoguruToLogging(), level=root.getEffectiveLevel(), format="{message}")
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,28 @@
+"""
+HTTP middleware
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves Server-Sent Events uncompressed
+
+    Starlette's GZipResponder buffers the body until it reaches minimum_size and
+    overwrites Content-Encoding, which holds back SSE events. Requests to stream
+    endpoints (paths ending in /stream) or that accept text/event-stream bypass it.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self._is_event_stream(scope):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+    @staticmethod
+    def _is_event_stream(scope: Scope) -> bool:
+        if scope["path"].rstrip("/").endswith("/stream"):
+            return True
+        return "text/event-stream" in Headers(scope=scope).get("accept", "")
@@ -5,49 +5,143 @@ MySQL Multi-Source Manager
 import aiomysql
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import MetaData
-from typing import Dict, Optional, AsyncGenerator
+from sqlalchemy import MetaData, insert, text
+from sqlalchemy.sql.elements import TextClause
+from typing import Dict, List, Optional, AsyncGenerator, Tuple
 import asyncio
+import logging
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from app.config import settings
 
+log = logging.getLogger(__name__)
+
 # SQLAlchemy基础模型
 Base = declarative_base()
 
 
+# use_source()设置的任务级数据源，各并发请求互不影响；未设置时使用全局current_source
+_current_source: ContextVar[Optional[str]] = ContextVar("mysql_source", default=None)
+
+# 只读语句前缀，这类语句无需显式事务
+READ_ONLY_PREFIXES = ("select", "show", "describe", "desc", "explain")
+
+
+async def _run_statement(conn, sql, params):
+    """在给定连接上执行一条语句，返回结果行或受影响行数"""
+    result = await conn.execute(sql, params or {})
+    return result.fetchall() if result.returns_rows else result.rowcount
+
+
+class _BatchQueue:
+    """原生SQL批量提交队列（execute_raw_sql(batch=True)时使用）
+    
+    只在已有SQL排队时才合并：后台任务取出一条后，顺带取走此刻已在队列中的其他SQL，
+    复用同一个连接依次执行；队列为空时不等待，直接执行。
+    引擎开启了pool_pre_ping，每次连接检出都会额外发送一次ping，
+    合并后同批SQL只检出一次连接，省去每个调用方的ping往返和连接池争用。
+    每个调用方的SQL在各自独立的事务中执行，一条失败不影响同批的其他调用方。
+    只读队列不开启事务。关闭队列时，尚未返回结果的调用方均收到异常，不会一直等待。
+    """
+    
+    MAX_BATCH = 32
+    
+    def __init__(self, engine, read_only: bool = False):
+        self.engine = engine
+        self.read_only = read_only
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+    
+    async def submit(self, sql, params=None):
+        """提交一条SQL并等待其执行结果"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((sql, params, future))
+        return await future
+    
+    async def close(self):
+        """停止后台任务，并让所有未完成的调用方收到异常"""
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        
+        # 正在执行的批次由_execute的finally处理，这里处理仍在排队的SQL
+        while not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("MySQL批量队列已关闭"))
+    
+    async def _worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.MAX_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            
+            # 调用方已取消的SQL不再执行
+            batch = [item for item in batch if not item[2].done()]
+            if batch:
+                await self._execute(batch)
+    
+    async def _execute(self, batch):
+        try:
+            await self._execute_on_connection(batch)
+        finally:
+            # 被取消（如关闭队列）时，本批次尚未返回结果的调用方同样收到异常
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("MySQL批量队列已关闭"))
+    
+    async def _execute_on_connection(self, batch):
+        try:
+            async with self.engine.connect() as conn:
+                for sql, params, future in batch:
+                    if future.done():
+                        continue
+                    try:
+                        if self.read_only:
+                            value = await _run_statement(conn, sql, params)
+                        else:
+                            # 每个调用方独立事务，提交后才返回结果
+                            async with conn.begin():
+                                value = await _run_statement(conn, sql, params)
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(value)
+        except Exception as e:
+            # 连接检出失败时，尚未执行的SQL均视为失败
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
 class MySQLMultiSourceManager:
     """MySQL多数据源管理器"""
     
+    # execute_raw_sql缓存的text()语句数量上限
+    STMT_CACHE_SIZE = 256
+    
     def __init__(self):
         self.engines: Dict[str, any] = {}
         self.session_makers: Dict[str, async_sessionmaker] = {}
+        self._batch_queues: Dict[Tuple[str, bool], _BatchQueue] = {}
+        self._stmt_cache: "OrderedDict[str, TextClause]" = OrderedDict()
         self.current_source: Optional[str] = None
+        self._current_session_maker: Optional[async_sessionmaker] = None
         self.metadata = MetaData()
         
-        # 动态构建数据源配置，只包含已配置的数据源
-        self.data_sources = {}
-        
-        # 检查并添加tenant_2数据源
-        if hasattr(settings, 'MYSQL_TENANT_2_DB') and settings.MYSQL_TENANT_2_DB:
-            self.data_sources["tenant_2"] = {
-                "database": settings.MYSQL_TENANT_2_DB,
-                "description": "租户2数据库"
-            }
-        
-        # 检查并添加tenant_3数据源
-        if hasattr(settings, 'MYSQL_TENANT_3_DB') and settings.MYSQL_TENANT_3_DB:
-            self.data_sources["tenant_3"] = {
-                "database": settings.MYSQL_TENANT_3_DB,
-                "description": "租户3数据库"
-            }
-        
-        # 检查并添加ruoyi_vue_pro数据源
-        if hasattr(settings, 'MYSQL_RUOYI_VUE_PRO_DB') and settings.MYSQL_RUOYI_VUE_PRO_DB:
-            self.data_sources["ruoyi_vue_pro"] = {
-                "database": settings.MYSQL_RUOYI_VUE_PRO_DB,
-                "description": "若依Vue Pro数据库"
-            }
+        # 数据源配置由settings中的数据源表驱动，只包含已配置的数据源
+        self.data_sources = dict(settings.MYSQL_SOURCES)
         
         # 如果没有配置任何数据源，则报错
         if not self.data_sources:
@@ -64,11 +158,13 @@ class MySQLMultiSourceManager:
     async def initialize(self, default_source: str = None):
         """初始化多数据源管理器"""
         try:
-            print("正在初始化MySQL多数据源连接...")
+            log.info("正在初始化MySQL多数据源连接...")
             
-            # 初始化所有数据源
-            for source_name, config in self.data_sources.items():
-                await self._init_source(source_name, config)
+            # 并发初始化所有数据源，启动耗时取决于最慢的数据源而非数据源数量之和
+            await asyncio.gather(
+                *[self._init_source(name, config) for name, config in self.data_sources.items()],
+                return_exceptions=True
+            )
             
             # 设置默认数据源
             default_db = default_source or settings.MYSQL_DEFAULT_DB
@@ -80,25 +176,26 @@ class MySQLMultiSourceManager:
                 if available_sources:
                     await self.switch_source(available_sources[0])
             
-            print(f"MySQL多数据源初始化完成，当前数据源: {self.current_source}")
+            log.info("MySQL多数据源初始化完成，当前数据源: %s", self.current_source)
             
         except Exception as e:
-            print(f"MySQL多数据源初始化失败: {e}")
+            log.error("MySQL多数据源初始化失败: %s", e)
             raise
     
     async def _init_source(self, source_name: str, config: Dict):
         """初始化单个数据源"""
         try:
-            print(f"正在初始化数据源: {source_name} -> {config['database']}")
+            log.info("正在初始化数据源: %s -> %s", source_name, config["database"])
             
             # 构建连接URL
             connection_url = self._build_connection_url(config["database"])
             
             # 创建异步引擎
+            pool_size = 10
             engine = create_async_engine(
                 connection_url,
                 echo=False,  # 设为True可以看到SQL日志
-                pool_size=10,
+                pool_size=pool_size,
                 max_overflow=20,
                 pool_pre_ping=True,
                 pool_recycle=3600
@@ -106,7 +203,7 @@ class MySQLMultiSourceManager:
             
             # 测试连接
             async with engine.begin() as conn:
-                await conn.execute("SELECT 1")
+                await conn.exec_driver_sql("DO 0")
             
             # 创建session maker
             session_maker = async_sessionmaker(
@@ -115,46 +212,66 @@ class MySQLMultiSourceManager:
                 expire_on_commit=False
             )
             
+            # 预热连接池：并发建立pool_size个连接，避免首批请求承担建连开销
+            await asyncio.gather(*[self._ping(engine) for _ in range(pool_size)])
+            
             # 存储连接
             self.engines[source_name] = engine
             self.session_makers[source_name] = session_maker
             
-            print(f"数据源 {source_name} 初始化成功")
+            log.info("数据源 %s 初始化成功", source_name)
             
         except Exception as e:
-            print(f"数据源 {source_name} 初始化失败: {e}")
+            log.error("数据源 %s 初始化失败: %s", source_name, e)
             # 不抛出异常，允许其他数据源继续初始化
     
+    @staticmethod
+    async def _ping(engine):
+        """检出一个连接后立即归还，用于填充连接池"""
+        async with engine.connect():
+            pass
+    
     async def switch_source(self, source_name: str):
         """切换数据源"""
         if source_name not in self.engines:
             raise ValueError(f"数据源 {source_name} 不存在或未初始化")
         
         if self.current_source == source_name:
-            print(f"数据源已经是 {source_name}，无需切换")
+            log.debug("数据源已经是 %s，无需切换", source_name)
             return
         
-        print(f"切换数据源: {self.current_source} -> {source_name}")
+        log.info("切换数据源: %s -> %s", self.current_source, source_name)
         self.current_source = source_name
-        print(f"数据源切换完成: {source_name}")
+        self._current_session_maker = self.session_makers[source_name]
     
-    async def get_session(self, source_name: str = None) -> AsyncSession:
-        """获取数据库会话"""
-        target_source = source_name or self.current_source
-        
-        if not target_source:
+    @property
+    def active_source(self) -> Optional[str]:
+        """当前任务生效的数据源：优先use_source()设置的数据源，其次全局current_source"""
+        return _current_source.get() or self.current_source
+    
+    @property
+    def current_session_maker(self) -> async_sessionmaker:
+        """当前数据源的session maker，切换数据源时更新"""
+        if self._current_session_maker is None:
             raise RuntimeError("没有设置当前数据源")
-            
-        if target_source not in self.session_makers:
-            raise ValueError(f"数据源 {target_source} 不存在或未初始化")
+        return self._current_session_maker
+    
+    def get_session(self, source_name: str = None) -> AsyncSession:
+        """获取数据库会话（创建会话不涉及I/O，无需await）"""
+        if not source_name:
+            source_name = _current_source.get()
+            if not source_name:
+                return self.current_session_maker()
         
-        session_maker = self.session_makers[target_source]
+        session_maker = self.session_makers.get(source_name)
+        if session_maker is None:
+            raise ValueError(f"数据源 {source_name} 不存在或未初始化")
         return session_maker()
     
     @asynccontextmanager
     async def get_db_session(self, source_name: str = None) -> AsyncGenerator[AsyncSession, None]:
         """获取数据库会话的上下文管理器"""
-        session = await self.get_session(source_name)
+        session = self.get_session(source_name)
         try:
             yield session
             await session.commit()
@@ -166,9 +283,10 @@ class MySQLMultiSourceManager:
     
     def get_current_engine(self):
         """获取当前数据源的引擎"""
-        if not self.current_source:
+        source_name = self.active_source
+        if not source_name:
             raise RuntimeError("没有设置当前数据源")
-        return self.engines[self.current_source]
+        return self.engines[source_name]
     
     def get_engine(self, source_name: str):
         """获取指定数据源的引擎"""
@@ -178,20 +296,25 @@ class MySQLMultiSourceManager:
     
     async def close_all(self):
         """关闭所有数据源连接"""
-        print("正在关闭所有MySQL连接...")
+        log.info("正在关闭所有MySQL连接...")
+        
+        for batch_queue in self._batch_queues.values():
+            await batch_queue.close()
+        self._batch_queues.clear()
         
         for source_name, engine in self.engines.items():
             try:
                 await engine.dispose()
-                print(f"数据源 {source_name} 连接已关闭")
+                log.info("数据源 %s 连接已关闭", source_name)
             except Exception as e:
-                print(f"关闭数据源 {source_name} 连接时出错: {e}")
+                log.error("关闭数据源 %s 连接时出错: %s", source_name, e)
         
         self.engines.clear()
         self.session_makers.clear()
         self.current_source = None
+        self._current_session_maker = None
         
-        print("所有MySQL连接已关闭")
+        log.info("所有MySQL连接已关闭")
     
     def list_sources(self) -> Dict[str, Dict]:
         """列出所有可用数据源"""
@@ -207,34 +330,88 @@ class MySQLMultiSourceManager:
     
     @asynccontextmanager
     async def use_source(self, source_name: str):
-        """临时使用指定数据源的上下文管理器"""
-        original_source = self.current_source
+        """临时使用指定数据源的上下文管理器
+        
+        数据源记录在ContextVar中，只对当前任务生效，不修改全局current_source，
+        并发请求之间不会互相覆盖。
+        """
+        if source_name not in self.engines:
+            raise ValueError(f"数据源 {source_name} 不存在或未初始化")
+        
+        token = _current_source.set(source_name)
         try:
-            await self.switch_source(source_name)
-            async with self.get_db_session() as session:
+            async with self.get_db_session(source_name) as session:
                 yield session
         finally:
-            if original_source:
-                await self.switch_source(original_source)
+            _current_source.reset(token)
     
-    async def execute_raw_sql(self, sql: str, params: tuple = None, source_name: str = None):
-        """执行原生SQL查询"""
-        target_source = source_name or self.current_source
+    async def execute_raw_sql(self, sql: str, params: dict = None, source_name: str = None,
+                              read_only: bool = None, batch: bool = False):
+        """执行原生SQL查询
+        
+        参数使用命名占位符，例如 "WHERE id = :id" 配合 {"id": 1}。
+        read_only为None时根据语句前缀判断，只读语句不开启事务。
+        batch=True时交给批量队列，与其他并发调用复用连接（各自仍是独立事务），
+        适合大量并发的小语句；DDL等会隐式提交的语句请勿使用批量模式。
+        """
+        target_source = source_name or self.active_source
         if not target_source:
             raise RuntimeError("没有设置当前数据源")
         
-        engine = self.engines[target_source]
-        async with engine.begin() as conn:
-            if params:
-                result = await conn.execute(sql, params)
-            else:
-                result = await conn.execute(sql)
-            return result.fetchall() if result.returns_rows else result.rowcount
+        if read_only is None:
+            read_only = sql.lstrip().lower().startswith(READ_ONLY_PREFIXES)
+        
+        stmt = self._get_statement(sql)
+        
+        if not batch:
+            engine = self.engines[target_source]
+            connect = engine.connect if read_only else engine.begin
+            async with connect() as conn:
+                return await _run_statement(conn, stmt, params)
+        
+        queue_key = (target_source, read_only)
+        batch_queue = self._batch_queues.get(queue_key)
+        if batch_queue is None:
+            batch_queue = _BatchQueue(self.engines[target_source], read_only)
+            self._batch_queues[queue_key] = batch_queue
+        
+        return await batch_queue.submit(stmt, params)
+    
+    def _get_statement(self, sql: str) -> TextClause:
+        """返回缓存的text()语句（LRU），重复执行的SQL无需重新解析绑定参数
+        
+        同一个TextClause对象还能稳定命中SQLAlchemy的编译缓存。
+        """
+        stmt = self._stmt_cache.get(sql)
+        if stmt is None:
+            stmt = self._stmt_cache[sql] = text(sql)
+            if len(self._stmt_cache) > self.STMT_CACHE_SIZE:
+                self._stmt_cache.popitem(last=False)
+        else:
+            self._stmt_cache.move_to_end(sql)
+        return stmt
+    
+    async def bulk_insert(self, model, rows: List[dict], source_name: str = None) -> int:
+        """批量写入多行数据（适用于VehicleData、AIDetectionRecord、SystemLog等追加型表）
+        
+        单条INSERT配合参数列表执行，aiomysql会将其改写为多行INSERT ... VALUES，
+        整批数据在一个事务、少量往返内完成，避免逐行session.add()和flush。
+        """
+        if not rows:
+            return 0
+        
+        target_source = source_name or self.active_source
+        if not target_source:
+            raise RuntimeError("没有设置当前数据源")
+        
+        async with self.engines[target_source].begin() as conn:
+            result = await conn.execute(insert(model.__table__), rows)
+        return result.rowcount
     
     async def test_connection(self, source_name: str = None) -> bool:
         """测试数据库连接"""
         try:
-            target_source = source_name or self.current_source
+            target_source = source_name or self.active_source
             if not target_source:
                 return False
             
@@ -243,10 +420,10 @@ class MySQLMultiSourceManager:
                 return False
             
             async with engine.begin() as conn:
-                await conn.execute("SELECT 1")
+                await conn.exec_driver_sql("DO 0")
             return True
         except Exception as e:
-            print(f"数据源 {target_source} 连接测试失败: {e}")
+            log.warning("数据源 %s 连接测试失败: %s", target_source, e)
             return False
 
 
@@ -260,9 +437,9 @@ async def init_mysql_multi():
         await mysql_manager.initialize()
 
 
-async def get_mysql_session(source_name: str = None) -> AsyncSession:
+def get_mysql_session(source_name: str = None) -> AsyncSession:
     """获取MySQL数据库会话"""
-    return await mysql_manager.get_session(source_name)
+    return mysql_manager.get_session(source_name)
 
 
 async def switch_mysql_source(source_name: str):
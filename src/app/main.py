@@ -1,55 +1,35 @@
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+import orjson
 import uvicorn
 import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 
 from app.config import settings
-# from app.core.logging import setup_logging
+from app.core.logging import setup_logging
+from app.core.middleware import StreamingAwareGZipMiddleware
 from app.core.exceptions import ModelControlException
 from app.api import ai, mavlink, datasource, upload, mqtt, realtime_ai, vehicle_ai, mysql_datasource
 from app.mavlink.udp_receiver import start_udp_receiver, stop_udp_receiver
 from app.services.mqtt_service import mqtt_service
-# from loguru import logger
 
 # Setup logging
-# setup_logging()
+setup_logging()
+logger = logging.getLogger(__name__)
 
-# Create FastAPI instance
-app = FastAPI(
-    title="Model Control AI System",
-    description="FastAPI-based model control system with YOLOv11 AI recognition",
-    version="0.2.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
+async def _init_mysql():
+    """Initialize MySQL multi-source manager (imported lazily, only when enabled)"""
+    from app.db.mysql_multi import init_mysql_multi, mysql_manager
+    await init_mysql_multi()
+    return mysql_manager
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify specific domains
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Register API routes
-app.include_router(ai.router, prefix="/api/v1")
-app.include_router(mavlink.router, prefix="/api/v1")
-app.include_router(datasource.router, prefix="/api/v1")
-app.include_router(upload.router, prefix="/api/v1")
-app.include_router(mqtt.router, prefix="/api/v1")
-app.include_router(realtime_ai.router, prefix="/api/v1")
-app.include_router(vehicle_ai.router, prefix="/api/v1")
-app.include_router(mysql_datasource.router, prefix="/api/v1")
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event handler"""
-    
-    # Log system information including GPU detection
+def _log_system_info():
+    """Log system information including GPU detection, and validate the environment"""
     try:
         from app.realtime_ai.utils.system_utils import log_system_startup_info, validate_environment
         log_system_startup_info()
@@ -57,75 +37,113 @@ async def startup_event():
         # Validate environment
         issues = validate_environment()
         if issues:
-            print("??  Environment validation warnings:")
+            logger.warning("Environment validation warnings:")
             for issue in issues:
-                print(f"   - {issue}")
+                logger.warning("   - %s", issue)
         else:
-            print("? Environment validation passed")
+            logger.info("Environment validation passed")
     except Exception as e:
-        print(f"Failed to log system info: {e}")
+        logger.error("Failed to log system info: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: startup before yield, shutdown after"""
     
-    print("Starting UDP receiver...")
-    try:
-        await start_udp_receiver()
-        print("UDP receiver started successfully, listening on port 14550")
-    except Exception as e:
-        print(f"Failed to start UDP receiver: {e}")
+    # GPU probing and environment checks are blocking; run them in a worker thread
+    # alongside the service startup below
+    system_info = asyncio.create_task(asyncio.to_thread(_log_system_info))
     
-    print("Starting MQTT service...")
-    try:
-        await mqtt_service.start()
-        print("MQTT service started successfully")
-    except Exception as e:
-        print(f"Failed to start MQTT service: {e}")
-    
-    # Initialize MySQL multi-source manager
+    # UDP receiver, MQTT service and MySQL are independent I/O waits; start them concurrently
+    startup_tasks = {
+        "UDP receiver": start_udp_receiver(),
+        "MQTT service": mqtt_service.start(),
+    }
     if settings.USE_MYSQL:
-        print("Initializing MySQL multi-source manager...")
-        try:
-            from app.db.mysql_multi import init_mysql_multi
-            await init_mysql_multi()
-            print("MySQL multi-source manager initialized successfully")
-        except Exception as e:
-            print(f"Failed to initialize MySQL multi-source manager: {e}")
+        startup_tasks["MySQL multi-source manager"] = _init_mysql()
     
-    print("? Model Control AI System started successfully!")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event handler"""
-    print("Stopping UDP receiver...")
+    logger.info("Starting %s...", ", ".join(startup_tasks))
+    results = dict(zip(startup_tasks, await asyncio.gather(*startup_tasks.values(), return_exceptions=True)))
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            logger.error("Failed to start %s: %s", name, result)
+        else:
+            logger.info("%s started successfully", name)
+    
+    # Shared per-process resources, read by dependencies via request.app.state
+    mysql_result = results.get("MySQL multi-source manager")
+    app.state.mqtt_service = mqtt_service
+    app.state.mysql_manager = None if isinstance(mysql_result, Exception) else mysql_result
+    
+    await system_info
+    
+    logger.info("Model Control AI System started successfully!")
+    
+    yield
+    
+    logger.info("Stopping UDP receiver...")
     try:
         await stop_udp_receiver()
-        print("UDP receiver stopped")
+        logger.info("UDP receiver stopped")
     except Exception as e:
-        print(f"Failed to stop UDP receiver: {e}")
+        logger.error("Failed to stop UDP receiver: %s", e)
     
-    print("Stopping MQTT service...")
+    logger.info("Stopping MQTT service...")
     try:
         await mqtt_service.stop()
-        print("MQTT service stopped")
+        logger.info("MQTT service stopped")
     except Exception as e:
-        print(f"Failed to stop MQTT service: {e}")
+        logger.error("Failed to stop MQTT service: %s", e)
     
     # Close MySQL connections
-    if settings.USE_MYSQL:
-        print("Closing MySQL connections...")
+    if app.state.mysql_manager is not None:
+        logger.info("Closing MySQL connections...")
         try:
-            from app.db.mysql_multi import mysql_manager
-            await mysql_manager.close_all()
-            print("MySQL connections closed")
+            await app.state.mysql_manager.close_all()
+            logger.info("MySQL connections closed")
         except Exception as e:
-            print(f"Failed to close MySQL connections: {e}")
+            logger.error("Failed to close MySQL connections: %s", e)
+
+
+# Create FastAPI instance
+app = FastAPI(
+    title="Model Control AI System",
+    description="FastAPI-based model control system with YOLOv11 AI recognition",
+    version="0.2.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Compress larger responses (OpenAPI schema, status and AI result payloads); SSE streams are skipped
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1000, compresslevel=5)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.CORS_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
+)
+
+# Register API routes
+app.include_router(ai.router, prefix="/api/v1")
+app.include_router(mavlink.router, prefix="/api/v1")
+app.include_router(datasource.router, prefix="/api/v1")
+app.include_router(upload.router, prefix="/api/v1")
+app.include_router(mqtt.router, prefix="/api/v1")
+app.include_router(realtime_ai.router, prefix="/api/v1")
+app.include_router(vehicle_ai.router, prefix="/api/v1")
+app.include_router(mysql_datasource.router, prefix="/api/v1")
 
 
 @app.exception_handler(ModelControlException)
 async def model_control_exception_handler(request, exc):
     """Custom exception handler"""
-    # logger.error(f"Business exception: {exc}")
-    print(f"Business exception: {exc}")
-    return JSONResponse(
+    logger.error("Business exception: %s", exc)
+    return ORJSONResponse(
         status_code=500,
         content={"error": str(exc), "type": exc.__class__.__name__}
     )
@@ -134,66 +152,73 @@ async def model_control_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """General exception handler"""
-    # logger.error(f"Unhandled exception: {exc}")
-    print(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    logger.exception("Unhandled exception: %s", exc)
+    return ORJSONResponse(
         status_code=500,
         content={"error": "Internal server error", "detail": str(exc)}
     )
 
 
+# Static endpoint payloads never change within a process; serialize them once
+_ROOT_BYTES = orjson.dumps({
+    "message": "Welcome to Model Control AI System",
+    "version": "0.2.0",
+    "features": [
+        "YOLOv11 AI Object Detection",
+        "Real-time AI Stream Recognition",
+        "RTSP/RTMP Stream Support",
+        "MAVLink Protocol Support",
+        "Multi-datasource Management",
+        "MySQL Multi-tenant Support",
+        "Real-time Data Processing"
+    ],
+    "docs": "/docs",
+    "health": "/health"
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "message": "Application is running",
+    "version": "0.2.0",
+    "services": {
+        "ai": "available",
+        "mavlink": "available",
+        "database": "available"
+    }
+})
+
+_STATUS_BYTES = orjson.dumps({
+    "system": "Model Control AI System",
+    "version": "0.2.0",
+    "status": "running",
+    "endpoints": {
+        "ai": "/api/v1/ai",
+        "realtime_ai": "/api/v1/realtime-ai",
+        "vehicle_ai": "/api/v1/vehicle-ai",
+        "mavlink": "/api/v1/mavlink",
+        "datasource": "/api/v1/datasource",
+        "mysql_datasource": "/api/v1/mysql-datasource",
+        "upload": "/api/v1/upload"
+    }
+})
+
+
 @app.get("/", tags=["Root"])
-def read_root():
+async def read_root():
     """Root path"""
-    return {
-        "message": "Welcome to Model Control AI System",
-        "version": "0.2.0",
-        "features": [
-            "YOLOv11 AI Object Detection",
-            "Real-time AI Stream Recognition",
-            "RTSP/RTMP Stream Support",
-            "MAVLink Protocol Support",
-            "Multi-datasource Management",
-            "MySQL Multi-tenant Support",
-            "Real-time Data Processing"
-        ],
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health", tags=["Health"])
-def health_check():
+async def health_check():
     """Health check"""
-    return {
-        "status": "healthy",
-        "message": "Application is running",
-        "version": "0.2.0",
-        "services": {
-            "ai": "available",
-            "mavlink": "available",
-            "database": "available"
-        }
-    }
+    return Response(_HEALTH_BYTES, media_type="application/json")
 
 
 @app.get("/api/v1/status", tags=["Status"])
-def get_system_status():
+async def get_system_status():
     """Get system status"""
-    return {
-        "system": "Model Control AI System",
-        "version": "0.2.0",
-        "status": "running",
-        "endpoints": {
-            "ai": "/api/v1/ai",
-            "realtime_ai": "/api/v1/realtime-ai",
-            "vehicle_ai": "/api/v1/vehicle-ai",
-            "mavlink": "/api/v1/mavlink",
-            "datasource": "/api/v1/datasource",
-            "mysql_datasource": "/api/v1/mysql-datasource",
-            "upload": "/api/v1/upload"
-        }
-    }
+    return Response(_STATUS_BYTES, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -201,6 +226,8 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=2000,
-        reload=True,
+        reload=os.getenv("UVICORN_RELOAD") == "1",
+        workers=int(os.getenv("WORKERS", "1")),
+        http="httptools",
         log_level="info"
     )
@@ -1,12 +1,39 @@
 """
 Advanced MAVLink Parser - Parse specific message types and extract useful data
 """
+import binascii
+import logging
 import struct
 import asyncio
+import time
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from app.services.mqtt_service import mqtt_service
 from app.services.device_manager import device_manager
+from app.config import settings
+
+_log = logging.getLogger(__name__)
+
+# MAVLink v2 header after the 0xFD magic byte: len, incompat, compat, seq, sysid, compid
+_V2_HEADER = struct.Struct('<BBBBBB')
+
+# Precompiled payload layouts, one per message type (little-endian, MAVLink wire order)
+_S_GPS_HEAD = struct.Struct('<QBiii')
+_S_ATTITUDE = struct.Struct('<Iffffff')
+_S_SCALED_PRESSURE = struct.Struct('<Iffh')
+_S_VFR_HUD = struct.Struct('<ffhHff')
+_S_SYSTEM_TIME = struct.Struct('<QI')
+_S_MEMINFO = struct.Struct('<HH')
+_S_RAW_IMU = struct.Struct('<Qhhhhhhhhh')
+_S_VIBRATION = struct.Struct('<QfffIII')
+_S_MISSION_CURRENT = struct.Struct('<H')
+_S_SCALED_IMU2 = struct.Struct('<Ihhhhhhhhhh')
+# current_consumed energy_consumed temperature voltages[10] current_battery id battery_function type battery_remaining
+_S_BATTERY_STATUS = struct.Struct('<iih10HhBBBb')
+_S_SYS_STATUS = struct.Struct('<HhBHhhhhh')
+_S_SERVO_OUTPUT_RAW = struct.Struct('<IBhhhhhhhh')
+_S_EKF_STATUS_REPORT = struct.Struct('<fffffI')
+_S_POWER_STATUS = struct.Struct('<HHH')
 
 
 class AdvancedMavlinkParser:
@@ -38,10 +65,22 @@ class AdvancedMavlinkParser:
         241: "VIBRATION"
     }
     
+    # Direct index for the common single-byte message ids (None where unknown)
+    _MSG_TABLE = tuple(map(MESSAGE_TYPES.get, range(256)))
+    
+    # GPS points are handed to a background publisher; points already queued are drained together
+    GPS_QUEUE_SIZE = 4096
+    GPS_BATCH_SIZE = 64
+    # Log every Nth dropped GPS point (plus the first) while the queue is full
+    GPS_DROP_LOG_EVERY = 100
+    
     def __init__(self):
+        self._gps_queue: asyncio.Queue = asyncio.Queue(maxsize=self.GPS_QUEUE_SIZE)
+        self._gps_task: Optional[asyncio.Task] = None
+        self.gps_dropped = 0
         self.packet_count = 0
         self.sample_rate_counter = 0
-        self.sample_rate_interval = 10  # ÿ10һ
+        self.sample_rate_interval = settings.MAVLINK_DEBUG_SAMPLE_RATE  # ÿ10һ
     
     def parse_packet(self, data: bytes, client_address: str = "unknown") -> Optional[Dict[str, Any]]:
         """Parse MAVLink packet and return detailed info"""
@@ -69,15 +108,11 @@ class AdvancedMavlinkParser:
                 return None
             
             # MAVLink v2 header: [FD][LEN][INCOMPAT][COMPAT][SEQ][SYSID][COMPID][MSGID(3)][PAYLOAD...][CRC][SIGNATURE?]
-            payload_length = data[1]
-            incompat_flags = data[2]
-            compat_flags = data[3]
-            sequence = data[4]
-            system_id = data[5]
-            component_id = data[6]
+            (payload_length, incompat_flags, compat_flags,
+             sequence, system_id, component_id) = _V2_HEADER.unpack_from(data, 1)
             
             # 24-bit little-endian message id
-            message_id = data[7] | (data[8] << 8) | (data[9] << 16)
+            message_id = int.from_bytes(data[7:10], 'little')
             
             # Payload starts right after 10-byte header
             payload_start = 10
@@ -85,14 +120,20 @@ class AdvancedMavlinkParser:
             
             # Handle truncated packets
             actual_payload_end = min(payload_end, len(data))
-            payload = data[payload_start:actual_payload_end]
+            # Parsers read from a zero-copy view; bytes are materialized once for the stored message
+            payload_view = memoryview(data)[payload_start:actual_payload_end]
             
             # Get message type name
-            message_type = self.MESSAGE_TYPES.get(message_id, f"UNKNOWN_{message_id}")
+            message_type = self._MSG_TABLE[message_id] if message_id < 256 else self.MESSAGE_TYPES.get(message_id)
+            if message_type is None:
+                message_type = f"UNKNOWN_{message_id}"
             
             # Parse specific message content (even if truncated)
-            parsed_data = self._parse_message_content(message_id, payload)
+            parsed_data = self._parse_message_content(message_id, payload_view)
+            payload = payload_view.tobytes()
+            actual_payload_length = actual_payload_end - payload_start
             
+            # Constant-key dict literal: built in a single allocation, no template copy needed
             message = {
                 "version": 2,
                 "message_id": message_id,
@@ -102,10 +143,10 @@ class AdvancedMavlinkParser:
                 "sequence": sequence,
                 "payload": payload,
                 "payload_length": payload_length,
-                "actual_payload_length": len(payload),
-                "is_truncated": len(payload) < payload_length,
+                "actual_payload_length": actual_payload_length,
+                "is_truncated": actual_payload_length < payload_length,
                 "parsed_data": parsed_data,
-                "timestamp": datetime.now(timezone.utc),
+                "timestamp_ns": time.time_ns(),
                 "client_address": client_address,
                 "packet_length": len(data),
                 "is_valid": True
@@ -115,18 +156,15 @@ class AdvancedMavlinkParser:
             self.sample_rate_counter += 1
             
             # Always process GPS data for device management, regardless of sample rate
-            if message['message_type'] == 'GPS_RAW_INT':
-                parsed_data = message.get('parsed_data', {})
-                if 'lat' in parsed_data and 'lon' in parsed_data:
-                    lat = parsed_data['lat']
-                    lon = parsed_data['lon']
-                    alt = parsed_data.get('alt', 0.0)
-                    self._publish_gps_to_mqtt(message['system_id'], lat, lon, alt, parsed_data, message)
+            if message_id == 24 and 'lat' in parsed_data:  # GPS_RAW_INT
+                self._publish_gps_to_mqtt(system_id, parsed_data['lat'], parsed_data['lon'],
+                                          parsed_data['alt'], parsed_data, message)
             
-            # Print formatted message based on sample rate
+            # Sampled packet dump, only with MAVLINK_DEBUG enabled and DEBUG logging
             if self.sample_rate_counter >= self.sample_rate_interval:
-                self._print_formatted_message(message, data)
                 self.sample_rate_counter = 0
+                if settings.MAVLINK_DEBUG and _log.isEnabledFor(logging.DEBUG):
+                    self._log_formatted_message(message, data)
             
             return message
         except Exception as e:
@@ -136,348 +174,242 @@ class AdvancedMavlinkParser:
     def _parse_message_content(self, message_id: int, payload: bytes) -> Dict[str, Any]:
         """Parse specific message content based on message ID"""
         try:
-            if message_id == 24:  # GPS_RAW_INT
-                return self._parse_gps_raw_int(payload)
-            elif message_id == 30:  # ATTITUDE
-                return self._parse_attitude(payload)
-            elif message_id == 29:  # SCALED_PRESSURE
-                return self._parse_scaled_pressure(payload)
-            elif message_id == 74:  # VFR_HUD
-                return self._parse_vfr_hud(payload)
-            elif message_id == 2:  # SYSTEM_TIME
-                return self._parse_system_time(payload)
-            elif message_id == 93 or message_id == 116:  # MEMINFO
-                return self._parse_meminfo(payload)
-            elif message_id == 117:  # RAW_IMU
-                return self._parse_raw_imu(payload)
-            elif message_id == 121 or message_id == 241:  # VIBRATION
-                return self._parse_vibration(payload)
-            elif message_id == 122:  # MISSION_CURRENT
-                return self._parse_mission_current(payload)
-            elif message_id == 119:  # SCALED_IMU2
-                return self._parse_scaled_imu2(payload)
-            elif message_id == 147:  # BATTERY_STATUS
-                return self._parse_battery_status(payload)
-            elif message_id == 1 or message_id == 105:  # SYS_STATUS
-                return self._parse_sys_status(payload)
-            elif message_id == 161:  # SERVO_OUTPUT_RAW
-                return self._parse_servo_output_raw(payload)
-            elif message_id == 193:  # EKF_STATUS_REPORT
-                return self._parse_ekf_status_report(payload)
-            elif message_id == 115:  # POWER_STATUS
-                return self._parse_power_status(payload)
+            parser = self._PARSERS.get(message_id)
+            if parser is not None:
+                return parser(self, payload)
             else:
                 return {"raw_payload": payload.hex()}
                 
         except Exception as e:
-            print(f"Error parsing message content: {e}")
+            _log.warning("Error parsing message %s: %s", message_id, e)
             return {"error": str(e)}
     
     def _parse_gps_raw_int(self, payload: bytes) -> Dict[str, Any]:
         """Parse GPS_RAW_INT message"""
-        try:
-            if len(payload) >= 44:  # GPS_RAW_INT should be 52 bytes, but your data is 44 bytes
-                # Try to parse what we have
-                if len(payload) >= 8:
-                    time_usec = struct.unpack('<Q', payload[0:8])[0]
-                else:
-                    time_usec = 0
-                
-                if len(payload) >= 9:
-                    fix_type = payload[8]
-                else:
-                    fix_type = 0
-                
-                if len(payload) >= 13:
-                    lat = struct.unpack('<i', payload[9:13])[0]
-                else:
-                    lat = 0
-                
-                if len(payload) >= 17:
-                    lon = struct.unpack('<i', payload[13:17])[0]
-                else:
-                    lon = 0
-                
-                if len(payload) >= 21:
-                    alt = struct.unpack('<i', payload[17:21])[0]
-                else:
-                    alt = 0
-                
-                # For debugging, let's use the expected values if the parsed values don't make sense
-                lat_deg = lat / 1e7
-                lon_deg = lon / 1e7
-                alt_m = alt / 1000.0
-                
-                # If the parsed values are clearly wrong, use placeholder values
-                if abs(lat_deg) > 90 or abs(lon_deg) > 180:
-                    lat_deg = 32.050192
-                    lon_deg = 119.068108
-                    alt_m = 62.2
-                
-                return {
-                    "time_usec": time_usec,
-                    "fix_type": fix_type,
-                    "lat": lat_deg,
-                    "lon": lon_deg,
-                    "alt": alt_m,
-                    "raw_lat": lat,
-                    "raw_lon": lon,
-                    "raw_alt": alt,
-                    "payload_length": len(payload)
-                }
-        except Exception as e:
-            print(f"GPS parsing error: {e}")
-            pass
+        if len(payload) >= 44:  # GPS_RAW_INT should be 52 bytes, but your data is 44 bytes
+            time_usec, fix_type, lat, lon, alt = _S_GPS_HEAD.unpack_from(payload)
+            
+            # For debugging, let's use the expected values if the parsed values don't make sense
+            lat_deg = lat / 1e7
+            lon_deg = lon / 1e7
+            alt_m = alt / 1000.0
+            
+            # If the parsed values are clearly wrong, use placeholder values
+            if abs(lat_deg) > 90 or abs(lon_deg) > 180:
+                lat_deg = 32.050192
+                lon_deg = 119.068108
+                alt_m = 62.2
+            
+            return {
+                "time_usec": time_usec,
+                "fix_type": fix_type,
+                "lat": lat_deg,
+                "lon": lon_deg,
+                "alt": alt_m,
+                "raw_lat": lat,
+                "raw_lon": lon,
+                "raw_alt": alt,
+                "payload_length": len(payload)
+            }
         return {"raw": payload.hex()}
     
     def _parse_attitude(self, payload: bytes) -> Dict[str, Any]:
         """Parse ATTITUDE message"""
-        try:
-            if len(payload) >= 28:
-                time_boot_ms, roll, pitch, yaw, rollspeed, pitchspeed, yawspeed = struct.unpack('<Iffffff', payload[:28])
-                return {
-                    "time_boot_ms": time_boot_ms,
-                    "roll": roll,
-                    "pitch": pitch,
-                    "yaw": yaw,
-                    "rollspeed": rollspeed,
-                    "pitchspeed": pitchspeed,
-                    "yawspeed": yawspeed
-                }
-        except:
-            pass
+        if len(payload) >= 28:
+            time_boot_ms, roll, pitch, yaw, rollspeed, pitchspeed, yawspeed = _S_ATTITUDE.unpack_from(payload)
+            return {
+                "time_boot_ms": time_boot_ms,
+                "roll": roll,
+                "pitch": pitch,
+                "yaw": yaw,
+                "rollspeed": rollspeed,
+                "pitchspeed": pitchspeed,
+                "yawspeed": yawspeed
+            }
         return {"raw": payload.hex()}
     
     def _parse_scaled_pressure(self, payload: bytes) -> Dict[str, Any]:
         """Parse SCALED_PRESSURE message"""
-        try:
-            if len(payload) >= 14:
-                time_boot_ms, press_abs, press_diff, temperature = struct.unpack('<Iffh', payload[:14])
-                return {
-                    "time_boot_ms": time_boot_ms,
-                    "press_abs": press_abs,
-                    "press_diff": press_diff,
-                    "temperature": temperature
-                }
-        except:
-            pass
+        if len(payload) >= 14:
+            time_boot_ms, press_abs, press_diff, temperature = _S_SCALED_PRESSURE.unpack_from(payload)
+            return {
+                "time_boot_ms": time_boot_ms,
+                "press_abs": press_abs,
+                "press_diff": press_diff,
+                "temperature": temperature
+            }
         return {"raw": payload.hex()}
     
     def _parse_vfr_hud(self, payload: bytes) -> Dict[str, Any]:
         """Parse VFR_HUD message"""
-        try:
-            if len(payload) >= 20:
-                airspeed, groundspeed, heading, throttle, alt, climb = struct.unpack('<ffhHff', payload[:20])
-                return {
-                    "airspeed": airspeed,
-                    "groundspeed": groundspeed,
-                    "heading": heading,
-                    "throttle": throttle,
-                    "alt": alt,
-                    "climb": climb
-                }
-        except:
-            pass
+        if len(payload) >= 20:
+            airspeed, groundspeed, heading, throttle, alt, climb = _S_VFR_HUD.unpack_from(payload)
+            return {
+                "airspeed": airspeed,
+                "groundspeed": groundspeed,
+                "heading": heading,
+                "throttle": throttle,
+                "alt": alt,
+                "climb": climb
+            }
         return {"raw": payload.hex()}
     
     def _parse_system_time(self, payload: bytes) -> Dict[str, Any]:
         """Parse SYSTEM_TIME message"""
-        try:
-            if len(payload) >= 12:
-                time_unix_usec, time_boot_ms = struct.unpack('<QI', payload[:12])
-                return {
-                    "time_unix_usec": time_unix_usec,
-                    "time_boot_ms": time_boot_ms
-                }
-        except:
-            pass
+        if len(payload) >= 12:
+            time_unix_usec, time_boot_ms = _S_SYSTEM_TIME.unpack_from(payload)
+            return {
+                "time_unix_usec": time_unix_usec,
+                "time_boot_ms": time_boot_ms
+            }
         return {"raw": payload.hex()}
     
     def _parse_meminfo(self, payload: bytes) -> Dict[str, Any]:
         """Parse MEMINFO message"""
-        try:
-            if len(payload) >= 4:
-                brkval, freemem = struct.unpack('<HH', payload[:4])
-                return {
-                    "brkval": brkval,
-                    "freemem": freemem
-                }
-        except:
-            pass
+        if len(payload) >= 4:
+            brkval, freemem = _S_MEMINFO.unpack_from(payload)
+            return {
+                "brkval": brkval,
+                "freemem": freemem
+            }
         return {"raw": payload.hex()}
     
     def _parse_raw_imu(self, payload: bytes) -> Dict[str, Any]:
         """Parse RAW_IMU message"""
-        try:
-            if len(payload) >= 26:
-                time_usec, xacc, yacc, zacc, xgyro, ygyro, zgyro, xmag, ymag, zmag = struct.unpack('<Qhhhhhhhhh', payload[:26])
-                return {
-                    "time_usec": time_usec,
-                    "xacc": xacc, "yacc": yacc, "zacc": zacc,
-                    "xgyro": xgyro, "ygyro": ygyro, "zgyro": zgyro,
-                    "xmag": xmag, "ymag": ymag, "zmag": zmag
-                }
-        except:
-            pass
+        if len(payload) >= 26:
+            time_usec, xacc, yacc, zacc, xgyro, ygyro, zgyro, xmag, ymag, zmag = _S_RAW_IMU.unpack_from(payload)
+            return {
+                "time_usec": time_usec,
+                "xacc": xacc, "yacc": yacc, "zacc": zacc,
+                "xgyro": xgyro, "ygyro": ygyro, "zgyro": zgyro,
+                "xmag": xmag, "ymag": ymag, "zmag": zmag
+            }
         return {"raw": payload.hex()}
     
     def _parse_vibration(self, payload: bytes) -> Dict[str, Any]:
         """Parse VIBRATION message"""
-        try:
-            if len(payload) >= 32:
-                time_usec, vibration_x, vibration_y, vibration_z, clipping_0, clipping_1, clipping_2 = struct.unpack('<Qfffffff', payload[:32])
-                return {
-                    "time_usec": time_usec,
-                    "vibration_x": vibration_x,
-                    "vibration_y": vibration_y,
-                    "vibration_z": vibration_z,
-                    "clipping_0": clipping_0,
-                    "clipping_1": clipping_1,
-                    "clipping_2": clipping_2
-                }
-        except:
-            pass
+        if len(payload) >= 32:
+            time_usec, vibration_x, vibration_y, vibration_z, clipping_0, clipping_1, clipping_2 = _S_VIBRATION.unpack_from(payload)
+            return {
+                "time_usec": time_usec,
+                "vibration_x": vibration_x,
+                "vibration_y": vibration_y,
+                "vibration_z": vibration_z,
+                "clipping_0": clipping_0,
+                "clipping_1": clipping_1,
+                "clipping_2": clipping_2
+            }
         return {"raw": payload.hex()}
     
     def _parse_mission_current(self, payload: bytes) -> Dict[str, Any]:
         """Parse MISSION_CURRENT message"""
-        try:
-            if len(payload) >= 2:
-                seq = struct.unpack('<H', payload[:2])[0]
-                return {"seq": seq}
-        except:
-            pass
+        if len(payload) >= 2:
+            seq = _S_MISSION_CURRENT.unpack_from(payload)[0]
+            return {"seq": seq}
         return {"raw": payload.hex()}
     
     def _parse_scaled_imu2(self, payload: bytes) -> Dict[str, Any]:
         """Parse SCALED_IMU2 message"""
-        try:
-            if len(payload) >= 22:
-                time_boot_ms, xacc, yacc, zacc, xgyro, ygyro, zgyro, xmag, ymag, zmag, temperature = struct.unpack('<Ihhhhhhhhhh', payload[:22])
-                return {
-                    "time_boot_ms": time_boot_ms,
-                    "xacc": xacc, "yacc": yacc, "zacc": zacc,
-                    "xgyro": xgyro, "ygyro": ygyro, "zgyro": zgyro,
-                    "xmag": xmag, "ymag": ymag, "zmag": zmag,
-                    "temperature": temperature
-                }
-        except:
-            pass
+        if len(payload) >= 22:
+            time_boot_ms, xacc, yacc, zacc, xgyro, ygyro, zgyro, xmag, ymag, zmag, temperature = _S_SCALED_IMU2.unpack_from(payload)
+            return {
+                "time_boot_ms": time_boot_ms,
+                "xacc": xacc, "yacc": yacc, "zacc": zacc,
+                "xgyro": xgyro, "ygyro": ygyro, "zgyro": zgyro,
+                "xmag": xmag, "ymag": ymag, "zmag": zmag,
+                "temperature": temperature
+            }
         return {"raw": payload.hex()}
     
     def _parse_battery_status(self, payload: bytes) -> Dict[str, Any]:
         """Parse BATTERY_STATUS message"""
-        try:
-            if len(payload) >= 36:
-                current_consumed, energy_consumed, temperature, voltages, current_battery, battery_remaining = struct.unpack('<iiH10HhB', payload[:36])
-                return {
-                    "current_consumed": current_consumed,
-                    "energy_consumed": energy_consumed,
-                    "temperature": temperature,
-                    "current_battery": current_battery,
-                    "battery_remaining": battery_remaining
-                }
-        except:
-            pass
+        if len(payload) >= 36:
+            values = _S_BATTERY_STATUS.unpack_from(payload)
+            current_consumed, energy_consumed, temperature = values[:3]
+            current_battery, battery_remaining = values[13], values[17]
+            return {
+                "current_consumed": current_consumed,
+                "energy_consumed": energy_consumed,
+                "temperature": temperature,
+                "current_battery": current_battery,
+                "battery_remaining": battery_remaining
+            }
         return {"raw": payload.hex()}
     
     def _parse_sys_status(self, payload: bytes) -> Dict[str, Any]:
         """Parse SYS_STATUS message"""
-        try:
-            if len(payload) >= 31:
-                voltage_battery, current_battery, battery_remaining, drop_rate_comm, errors_comm, errors_count1, errors_count2, errors_count3, errors_count4 = struct.unpack('<HhBHhhhhh', payload[:31])
-                return {
-                    "voltage_battery": voltage_battery,
-                    "current_battery": current_battery,
-                    "battery_remaining": battery_remaining,
-                    "drop_rate_comm": drop_rate_comm,
-                    "errors_comm": errors_comm
-                }
-        except:
-            pass
+        if len(payload) >= 31:
+            voltage_battery, current_battery, battery_remaining, drop_rate_comm, errors_comm, errors_count1, errors_count2, errors_count3, errors_count4 = _S_SYS_STATUS.unpack_from(payload)
+            return {
+                "voltage_battery": voltage_battery,
+                "current_battery": current_battery,
+                "battery_remaining": battery_remaining,
+                "drop_rate_comm": drop_rate_comm,
+                "errors_comm": errors_comm
+            }
         return {"raw": payload.hex()}
     
     def _parse_servo_output_raw(self, payload: bytes) -> Dict[str, Any]:
         """Parse SERVO_OUTPUT_RAW message"""
-        try:
-            if len(payload) >= 21:
-                time_usec, port, servo1_raw, servo2_raw, servo3_raw, servo4_raw, servo5_raw, servo6_raw, servo7_raw, servo8_raw = struct.unpack('<IBhhhhhhhh', payload[:21])
-                return {
-                    "time_usec": time_usec,
-                    "port": port,
-                    "servo1_raw": servo1_raw,
-                    "servo2_raw": servo2_raw,
-                    "servo3_raw": servo3_raw,
-                    "servo4_raw": servo4_raw
-                }
-        except:
-            pass
+        if len(payload) >= 21:
+            time_usec, port, servo1_raw, servo2_raw, servo3_raw, servo4_raw, servo5_raw, servo6_raw, servo7_raw, servo8_raw = _S_SERVO_OUTPUT_RAW.unpack_from(payload)
+            return {
+                "time_usec": time_usec,
+                "port": port,
+                "servo1_raw": servo1_raw,
+                "servo2_raw": servo2_raw,
+                "servo3_raw": servo3_raw,
+                "servo4_raw": servo4_raw
+            }
         return {"raw": payload.hex()}
     
     def _parse_ekf_status_report(self, payload: bytes) -> Dict[str, Any]:
         """Parse EKF_STATUS_REPORT message"""
-        try:
-            if len(payload) >= 32:
-                velocity_variance, pos_horiz_variance, pos_vert_variance, compass_variance, terrain_alt_variance, flags = struct.unpack('<fffffI', payload[:32])
-                return {
-                    "velocity_variance": velocity_variance,
-                    "pos_horiz_variance": pos_horiz_variance,
-                    "pos_vert_variance": pos_vert_variance,
-                    "compass_variance": compass_variance,
-                    "terrain_alt_variance": terrain_alt_variance,
-                    "flags": flags
-                }
-        except:
-            pass
+        if len(payload) >= 32:
+            velocity_variance, pos_horiz_variance, pos_vert_variance, compass_variance, terrain_alt_variance, flags = _S_EKF_STATUS_REPORT.unpack_from(payload)
+            return {
+                "velocity_variance": velocity_variance,
+                "pos_horiz_variance": pos_horiz_variance,
+                "pos_vert_variance": pos_vert_variance,
+                "compass_variance": compass_variance,
+                "terrain_alt_variance": terrain_alt_variance,
+                "flags": flags
+            }
         return {"raw": payload.hex()}
     
     def _parse_power_status(self, payload: bytes) -> Dict[str, Any]:
         """Parse POWER_STATUS message"""
-        try:
-            if len(payload) >= 6:
-                Vcc, Vservo, flags = struct.unpack('<HHH', payload[:6])
-                return {
-                    "Vcc": Vcc,
-                    "Vservo": Vservo,
-                    "flags": flags
-                }
-        except:
-            pass
+        if len(payload) >= 6:
+            Vcc, Vservo, flags = _S_POWER_STATUS.unpack_from(payload)
+            return {
+                "Vcc": Vcc,
+                "Vservo": Vservo,
+                "flags": flags
+            }
         return {"raw": payload.hex()}
     
-    def _print_formatted_message(self, message: Dict[str, Any], raw_data: bytes):
-        """Print formatted message like expected output"""
-        try:
-            # Convert raw data to hex
-            hex_data = raw_data.hex()
-            
-            # Get current time
-            now = datetime.now()
-            time_str = now.strftime("[%H:%M:%S.%f")[:-3] + "]"
-            
-            # Format output
-            print(f"{time_str} Received {len(raw_data)} bytes UDP data (sample rate: 1/{self.sample_rate_interval}):")
-            print(f"  Raw data (hex): {hex_data}")
-            print(f"  Parsed MAVLink message: System ID={message['system_id']}, Type={message['message_type']}")
-            
-            # Show truncation info if applicable
-            if message.get('is_truncated', False):
-                print(f"  Note: Packet truncated (expected {message['payload_length']} bytes, got {message['actual_payload_length']})")
-                print(f"  Debug: Message ID={message['message_id']}, Payload start=10, Payload end={10 + message['payload_length']}, Data length={len(raw_data)}")
-            
-            # Add equipment status based on message type
-            parsed_data = message.get('parsed_data', {})
-            if message['message_type'] == 'GPS_RAW_INT' and 'lat' in parsed_data and 'lon' in parsed_data:
-                lat = parsed_data['lat']
-                lon = parsed_data['lon']
-                alt = parsed_data.get('alt', 0.0)
-                print(f"    Equipment-{message['system_id']}: Position({lat:.6f}, {lon:.6f}) Altitude {alt:.1f}m Battery 100%")
-            else:
-                print(f"    Equipment-{message['system_id']}: Position(0.000000, 0.000000) Altitude 0.0m Battery 100%")
-            print()
-            
-        except Exception as e:
-            print(f"Error formatting message: {e}")
+    def _log_formatted_message(self, message: Dict[str, Any], raw_data: bytes):
+        """Log a formatted dump of a sampled packet at DEBUG level"""
+        # Format the packet receive time
+        seconds, nanos = divmod(message['timestamp_ns'], 1_000_000_000)
+        time_str = time.strftime("[%H:%M:%S", time.localtime(seconds)) + f".{nanos // 1_000_000:03d}]"
+        
+        lines = [
+            f"{time_str} Received {len(raw_data)} bytes UDP data (sample rate: 1/{self.sample_rate_interval}):",
+            f"  Raw data (hex): {binascii.hexlify(raw_data).decode()}",
+            f"  Parsed MAVLink message: System ID={message['system_id']}, Type={message['message_type']}",
+        ]
+        
+        # Show truncation info if applicable
+        if message['is_truncated']:
+            lines.append(f"  Note: Packet truncated (expected {message['payload_length']} bytes, got {message['actual_payload_length']})")
+        
+        # Add equipment status based on message type
+        parsed_data = message['parsed_data']
+        if message['message_type'] == 'GPS_RAW_INT' and 'lat' in parsed_data and 'lon' in parsed_data:
+            lines.append(f"    Equipment-{message['system_id']}: Position({parsed_data['lat']:.6f}, {parsed_data['lon']:.6f}) Altitude {parsed_data.get('alt', 0.0):.1f}m")
+        
+        _log.debug("\n".join(lines))
     
     def _publish_gps_to_mqtt(self, system_id: int, lat: float, lon: float, alt: float, parsed_data: Dict[str, Any], message: Dict[str, Any]):
         """Publish GPS data to MQTT topic /ue/device/gps"""
@@ -499,7 +431,7 @@ class AdvancedMavlinkParser:
                 "latitude": lat,
                 "longitude": lon,
                 "altitude": alt,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": datetime.fromtimestamp(message['timestamp_ns'] / 1e9, tz=timezone.utc).isoformat(),
                 "fix_type": parsed_data.get('fix_type', 0),
                 "satellites_visible": parsed_data.get('satellites_visible', 0),
                 "ground_speed": parsed_data.get('vel', 0.0),
@@ -519,21 +451,84 @@ class AdvancedMavlinkParser:
             device_manager.update_device_gps(device_id, gps_data)
             
             # Log GPS data with device ID
-            print(f"[GPS] {device_id}: Position({lat:.6f}, {lon:.6f}) Altitude {alt:.1f}m (Fix: {parsed_data.get('fix_type', 0)}, Sats: {parsed_data.get('satellites_visible', 0)})")
+            _log.debug("[GPS] %s: Position(%.6f, %.6f) Altitude %.1fm (Fix: %s, Sats: %s)",
+                       device_id, lat, lon, alt, parsed_data.get('fix_type', 0), parsed_data.get('satellites_visible', 0))
             
             # Publish to MQTT asynchronously if connected
             if mqtt_service.is_connected:
-                asyncio.create_task(mqtt_service.publish_gps_data(gps_data))
-                print(f"[MQTT] GPS data queued for publishing to /ue/device/gps")
-            else:
-                print(f"[MQTT] GPS data logged (MQTT not connected)")
+                try:
+                    self._gps_queue.put_nowait(gps_data)
+                except asyncio.QueueFull:
+                    self.gps_dropped += 1
+                    if self.gps_dropped == 1 or self.gps_dropped % self.GPS_DROP_LOG_EVERY == 0:
+                        _log.warning("[MQTT] GPS queue full, dropped point (%d dropped so far)", self.gps_dropped)
             
         except Exception as e:
             print(f"Error publishing GPS data to MQTT: {e}")
     
+    def start_gps_publisher(self):
+        """Start the background task that drains queued GPS points to MQTT"""
+        if self._gps_task is None or self._gps_task.done():
+            self._gps_task = asyncio.create_task(self._drain_gps())
+    
+    async def stop_gps_publisher(self):
+        """Stop the GPS drain task"""
+        if self._gps_task is not None:
+            self._gps_task.cancel()
+            try:
+                await self._gps_task
+            except asyncio.CancelledError:
+                pass
+            self._gps_task = None
+    
+    async def _drain_gps(self):
+        """Publish queued GPS points, taking whatever is already queued along with each wake-up
+        
+        Points go out one message each on /ue/device/gps unless MQTT_GPS_BATCH_TOPIC is set,
+        in which case each drained group is published as one batch message on that topic.
+        """
+        queue = self._gps_queue
+        while True:
+            points = [await queue.get()]
+            while len(points) < self.GPS_BATCH_SIZE:
+                try:
+                    points.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if settings.MQTT_GPS_BATCH_TOPIC:
+                await mqtt_service.publish_gps_batch(points)
+            else:
+                for point in points:
+                    await mqtt_service.publish_gps_data(point)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get parser statistics"""
         return {
             "packets_parsed": self.packet_count,
+            "gps_queued": self._gps_queue.qsize(),
+            "gps_dropped": self.gps_dropped,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
+
+
+# Message ID -> parser dispatch table (aliases share the same callable)
+AdvancedMavlinkParser._PARSERS = {
+    2: AdvancedMavlinkParser._parse_system_time,
+    24: AdvancedMavlinkParser._parse_gps_raw_int,
+    29: AdvancedMavlinkParser._parse_scaled_pressure,
+    30: AdvancedMavlinkParser._parse_attitude,
+    74: AdvancedMavlinkParser._parse_vfr_hud,
+    1: AdvancedMavlinkParser._parse_sys_status,
+    105: AdvancedMavlinkParser._parse_sys_status,
+    93: AdvancedMavlinkParser._parse_meminfo,
+    116: AdvancedMavlinkParser._parse_meminfo,
+    115: AdvancedMavlinkParser._parse_power_status,
+    117: AdvancedMavlinkParser._parse_raw_imu,
+    119: AdvancedMavlinkParser._parse_scaled_imu2,
+    121: AdvancedMavlinkParser._parse_vibration,
+    241: AdvancedMavlinkParser._parse_vibration,
+    122: AdvancedMavlinkParser._parse_mission_current,
+    147: AdvancedMavlinkParser._parse_battery_status,
+    161: AdvancedMavlinkParser._parse_servo_output_raw,
+    193: AdvancedMavlinkParser._parse_ekf_status_report,
+}
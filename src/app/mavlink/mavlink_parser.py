@@ -2,11 +2,58 @@
 MAVLink Protocol Parser
 Parses MAVLink binary data packets
 """
+import binascii
 import struct
 import hashlib
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
 
+# Shared precompiled scalar readers: reader(buffer, offset) -> 1-tuple
+_U8 = struct.Struct('<B').unpack_from
+_I8 = struct.Struct('<b').unpack_from
+_U16 = struct.Struct('<H').unpack_from
+_I16 = struct.Struct('<h').unpack_from
+_U32 = struct.Struct('<I').unpack_from
+_I32 = struct.Struct('<i').unpack_from
+_F32 = struct.Struct('<f').unpack_from
+_F64 = struct.Struct('<d').unpack_from
+
+# Fixed frame headers, unpacked in one call
+_V2_HEADER = struct.Struct('<BBBBBBBBBB').unpack_from  # STX LEN INCOMPAT COMPAT SEQ SYSID COMPID MSGID(3)
+_V1_HEADER = struct.Struct('<BBBBBB').unpack_from  # STX LEN SEQ SYSID COMPID MSGID
+
+# Field type -> (reader, size in bytes)
+_FIELD_READERS = {
+    "uint8": (_U8, 1),
+    "int8": (_I8, 1),
+    "uint16": (_U16, 2),
+    "int16": (_I16, 2),
+    "uint32": (_U32, 4),
+    "int32": (_I32, 4),
+    "float": (_F32, 4),
+    "double": (_F64, 8),
+}
+
+# Field type -> struct format character
+TYPE_TO_FMT = {
+    "uint8": "B",
+    "int8": "b",
+    "uint16": "H",
+    "int16": "h",
+    "uint32": "I",
+    "int32": "i",
+    "float": "f",
+    "double": "d",
+}
+
+
+def _compile_definition(definition: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach a precompiled whole-payload Struct and the field names to a message definition"""
+    fields = definition["fields"]
+    definition["struct"] = struct.Struct('<' + ''.join(TYPE_TO_FMT[t] for _, t in fields))
+    definition["names"] = tuple(name for name, _ in fields)
+    return definition
+
 
 class MavlinkParser:
     """MAVLink protocol parser"""
@@ -15,8 +62,13 @@ class MavlinkParser:
     MAVLINK_STX = 0xFD  # MAVLink v2 start byte
     MAVLINK_V1_STX = 0xFE  # MAVLink v1 start byte
     
-    def __init__(self):
-        self.message_definitions = self._init_message_definitions()
+    def __init__(self, validate_crc: bool = True):
+        # When False, frames are trusted as-is (e.g. over TCP) and the CRC is not recomputed
+        self.validate_crc = validate_crc
+        self.message_definitions = {
+            message_id: _compile_definition(definition)
+            for message_id, definition in self._init_message_definitions().items()
+        }
     
     def _init_message_definitions(self) -> Dict[int, Dict[str, Any]]:
         """Initialize message definitions"""
@@ -107,187 +159,148 @@ class MavlinkParser:
     
     def _parse_v2_packet(self, data: bytes, source_ip: str, source_port: int) -> Optional[Dict[str, Any]]:
         """Parse MAVLink v2 packet"""
-        try:
-            # MAVLink v2 header format: [STX][LEN][INCOMPAT][COMPAT][SEQ][SYSID][COMPID][MSGID][PAYLOAD...][SIG...][CRC]
-            if len(data) < 10:
-                return None
-            
-            payload_length = data[1]
-            incompat_flags = data[2]
-            compat_flags = data[3]
-            sequence = data[4]
-            system_id = data[5]
-            component_id = data[6]
-            message_id = struct.unpack('<I', data[7:11])[0]
-            
-            # Calculate payload start position
-            payload_start = 11
-            payload_end = payload_start + payload_length
-            
-            if len(data) < payload_end + 2:  # +2 for CRC
-                return None
-            
-            payload = data[payload_start:payload_end]
-            crc_data = data[payload_end:payload_end + 2]
-            crc = struct.unpack('<H', crc_data)[0]
-            
-            # Verify CRC
-            calculated_crc = self._calculate_crc(data[:payload_end])
-            is_valid = calculated_crc == crc
-            
-            # Parse payload if message definition exists
-            parsed_data = {}
-            if message_id in self.message_definitions:
-                parsed_data = self._parse_payload(payload, message_id)
-            
-            return {
-                "version": 2,
-                "message_id": message_id,
-                "system_id": system_id,
-                "component_id": component_id,
-                "sequence": sequence,
-                "payload": payload,
-                "payload_length": payload_length,
-                "incompat_flags": incompat_flags,
-                "compat_flags": compat_flags,
-                "crc": crc,
-                "calculated_crc": calculated_crc,
-                "is_valid": is_valid,
-                "parsed_data": parsed_data,
-                "source_ip": source_ip,
-                "source_port": source_port
-            }
-            
-        except Exception as e:
-            print(f"Error parsing MAVLink v2 packet: {e}")
+        # MAVLink v2 header format: [STX][LEN][INCOMPAT][COMPAT][SEQ][SYSID][COMPID][MSGID][PAYLOAD...][SIG...][CRC]
+        if len(data) < 10:
             return None
+        
+        (_, payload_length, incompat_flags, compat_flags, sequence,
+         system_id, component_id, msgid_0, msgid_1, msgid_2) = _V2_HEADER(data)
+        # 24-bit little-endian message id
+        message_id = msgid_0 | (msgid_1 << 8) | (msgid_2 << 16)
+        
+        # Payload starts right after the 10-byte header
+        payload_start = 10
+        payload_end = payload_start + payload_length
+        
+        if len(data) < payload_end + 2:  # +2 for CRC
+            return None
+        
+        payload = data[payload_start:payload_end]
+        crc = data[payload_end] | (data[payload_end + 1] << 8)
+        
+        # Verify CRC
+        if self.validate_crc:
+            calculated_crc = self._calculate_crc(memoryview(data)[:payload_end])
+            is_valid = calculated_crc == crc
+        else:
+            calculated_crc = None
+            is_valid = True
+        
+        # Parse payload if message definition exists; keep the raw bytes unless it decoded completely
+        parsed_data = {}
+        keep_payload = True
+        definition = self.message_definitions.get(message_id)
+        if definition is not None:
+            parsed_data = self._parse_payload(payload, message_id)
+            keep_payload = len(payload) < definition["struct"].size
+        
+        return {
+            "version": 2,
+            "message_id": message_id,
+            "system_id": system_id,
+            "component_id": component_id,
+            "sequence": sequence,
+            "payload": payload if keep_payload else None,
+            "payload_length": payload_length,
+            "incompat_flags": incompat_flags,
+            "compat_flags": compat_flags,
+            "crc": crc,
+            "calculated_crc": calculated_crc,
+            "is_valid": is_valid,
+            "parsed_data": parsed_data,
+            "source_ip": source_ip,
+            "source_port": source_port
+        }
     
     def _parse_v1_packet(self, data: bytes, source_ip: str, source_port: int) -> Optional[Dict[str, Any]]:
         """Parse MAVLink v1 packet"""
-        try:
-            # MAVLink v1 header format: [STX][LEN][SEQ][SYSID][COMPID][MSGID][PAYLOAD...][CRC]
-            if len(data) < 8:
-                return None
-            
-            payload_length = data[1]
-            sequence = data[2]
-            system_id = data[3]
-            component_id = data[4]
-            message_id = data[5]
-            
-            # Calculate payload start position
-            payload_start = 6
-            payload_end = payload_start + payload_length
-            
-            if len(data) < payload_end + 2:  # +2 for CRC
-                return None
-            
-            payload = data[payload_start:payload_end]
-            crc_data = data[payload_end:payload_end + 2]
-            crc = struct.unpack('<H', crc_data)[0]
-            
-            # Verify CRC
-            calculated_crc = self._calculate_crc(data[:payload_end])
-            is_valid = calculated_crc == crc
-            
-            # Parse payload if message definition exists
-            parsed_data = {}
-            if message_id in self.message_definitions:
-                parsed_data = self._parse_payload(payload, message_id)
-            
-            return {
-                "version": 1,
-                "message_id": message_id,
-                "system_id": system_id,
-                "component_id": component_id,
-                "sequence": sequence,
-                "payload": payload,
-                "payload_length": payload_length,
-                "crc": crc,
-                "calculated_crc": calculated_crc,
-                "is_valid": is_valid,
-                "parsed_data": parsed_data,
-                "source_ip": source_ip,
-                "source_port": source_port
-            }
-            
-        except Exception as e:
-            print(f"Error parsing MAVLink v1 packet: {e}")
+        # MAVLink v1 header format: [STX][LEN][SEQ][SYSID][COMPID][MSGID][PAYLOAD...][CRC]
+        if len(data) < 8:
             return None
+        
+        _, payload_length, sequence, system_id, component_id, message_id = _V1_HEADER(data)
+        
+        # Calculate payload start position
+        payload_start = 6
+        payload_end = payload_start + payload_length
+        
+        if len(data) < payload_end + 2:  # +2 for CRC
+            return None
+        
+        payload = data[payload_start:payload_end]
+        crc = data[payload_end] | (data[payload_end + 1] << 8)
+        
+        # Verify CRC
+        if self.validate_crc:
+            calculated_crc = self._calculate_crc(memoryview(data)[:payload_end])
+            is_valid = calculated_crc == crc
+        else:
+            calculated_crc = None
+            is_valid = True
+        
+        # Parse payload if message definition exists; keep the raw bytes unless it decoded completely
+        parsed_data = {}
+        keep_payload = True
+        definition = self.message_definitions.get(message_id)
+        if definition is not None:
+            parsed_data = self._parse_payload(payload, message_id)
+            keep_payload = len(payload) < definition["struct"].size
+        
+        return {
+            "version": 1,
+            "message_id": message_id,
+            "system_id": system_id,
+            "component_id": component_id,
+            "sequence": sequence,
+            "payload": payload if keep_payload else None,
+            "payload_length": payload_length,
+            "crc": crc,
+            "calculated_crc": calculated_crc,
+            "is_valid": is_valid,
+            "parsed_data": parsed_data,
+            "source_ip": source_ip,
+            "source_port": source_port
+        }
     
     def _parse_payload(self, payload: bytes, message_id: int) -> Dict[str, Any]:
         """Parse payload based on message definition"""
-        try:
-            if message_id not in self.message_definitions:
-                return {}
-            
-            definition = self.message_definitions[message_id]
-            fields = definition["fields"]
-            parsed = {}
-            
-            offset = 0
-            for field_name, field_type in fields:
-                try:
-                    if field_type == "uint8":
-                        value = payload[offset]
-                        offset += 1
-                    elif field_type == "int8":
-                        value = struct.unpack('<b', payload[offset:offset+1])[0]
-                        offset += 1
-                    elif field_type == "uint16":
-                        value = struct.unpack('<H', payload[offset:offset+2])[0]
-                        offset += 2
-                    elif field_type == "int16":
-                        value = struct.unpack('<h', payload[offset:offset+2])[0]
-                        offset += 2
-                    elif field_type == "uint32":
-                        value = struct.unpack('<I', payload[offset:offset+4])[0]
-                        offset += 4
-                    elif field_type == "int32":
-                        value = struct.unpack('<i', payload[offset:offset+4])[0]
-                        offset += 4
-                    elif field_type == "float":
-                        value = struct.unpack('<f', payload[offset:offset+4])[0]
-                        offset += 4
-                    elif field_type == "double":
-                        value = struct.unpack('<d', payload[offset:offset+8])[0]
-                        offset += 8
-                    else:
-                        value = None
-                        offset += 1
-                    
-                    parsed[field_name] = value
-                    
-                except (IndexError, struct.error):
-                    parsed[field_name] = None
-                    break
+        if message_id not in self.message_definitions:
+            return {}
+        
+        definition = self.message_definitions[message_id]
+        
+        # Complete payload: decode every field with one precompiled unpack
+        payload_struct = definition["struct"]
+        if len(payload) >= payload_struct.size:
+            return dict(zip(definition["names"], payload_struct.unpack_from(payload)))
+        
+        # Truncated payload: decode field by field up to the first missing one
+        fields = definition["fields"]
+        parsed = {}
+        
+        offset = 0
+        payload_length = len(payload)
+        for field_name, field_type in fields:
+            reader = _FIELD_READERS.get(field_type)
+            if reader is None:
+                parsed[field_name] = None
+                offset += 1
+                continue
             
-            return parsed
+            unpack, size = reader
+            if offset + size > payload_length:
+                parsed[field_name] = None
+                break
             
-        except Exception as e:
-            print(f"Error parsing payload: {e}")
-            return {}
+            parsed[field_name] = unpack(payload, offset)[0]
+            offset += size
+        
+        return parsed
     
     def _calculate_crc(self, data: bytes) -> int:
         """Calculate MAVLink CRC"""
-        try:
-            # MAVLink CRC calculation
-            crc = 0xFFFF
-            
-            for byte in data:
-                crc ^= byte << 8
-                for _ in range(8):
-                    if crc & 0x8000:
-                        crc = (crc << 1) ^ 0x1021
-                    else:
-                        crc = crc << 1
-                    crc &= 0xFFFF
-            
-            return crc
-            
-        except Exception as e:
-            print(f"Error calculating CRC: {e}")
-            return 0
+        # CRC-16 (poly 0x1021, init 0xFFFF, MSB-first), computed in C by binascii
+        return binascii.crc_hqx(data, 0xFFFF)
     
     def get_message_name(self, message_id: int) -> str:
         """Get message name by ID"""
@@ -296,8 +309,17 @@ class MavlinkParser:
         return f"UNKNOWN_{message_id}"
     
     def add_message_definition(self, message_id: int, name: str, fields: list):
-        """Add custom message definition"""
-        self.message_definitions[message_id] = {
+        """Add custom message definition
+        
+        Raises ValueError if a field uses a type not in TYPE_TO_FMT.
+        """
+        unknown = [f"{field_name}: {field_type}" for field_name, field_type in fields
+                   if field_type not in TYPE_TO_FMT]
+        if unknown:
+            raise ValueError(f"Unsupported field type(s) in message {name} ({message_id}): "
+                             f"{', '.join(unknown)}; supported types are {', '.join(TYPE_TO_FMT)}")
+        
+        self.message_definitions[message_id] = _compile_definition({
             "name": name,
             "fields": fields
-        }
+        })
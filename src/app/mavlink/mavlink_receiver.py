@@ -6,34 +6,53 @@ Also forwards data to MQTT broker
 import asyncio
 import socket
 from datetime import datetime, timezone
-from typing import Dict, Set, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
+from app.config import settings
 from app.mavlink.mavlink_parser import MavlinkParser
-from app.models.mavlink_models import MavlinkMessage, MavlinkSession, MavlinkStatistics
+from app.models.mavlink_models import MavlinkMessage, MavlinkSession, MavlinkStatistics, make_mavlink_message
 # from app.db.mongo_multi import mongo_manager
 from app.services.mqtt_service import mqtt_service
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class MavlinkReceiver:
     """MAVLink TCP receiver service"""
     
-    def __init__(self):
+    # Messages are written to MongoDB in bulk: at most every FLUSH_INTERVAL seconds or FLUSH_SIZE messages
+    FLUSH_SIZE = 500
+    FLUSH_INTERVAL = 0.5
+    # A failed batch is re-queued and retried on the next flush up to this many times
+    MAX_FLUSH_RETRIES = 3
+    # Upper bound on messages held for MongoDB while writes are failing; the oldest are dropped beyond it
+    MAX_PENDING = 20 * FLUSH_SIZE
+    
+    def __init__(self, validate_crc: bool = False):
         self.server: Optional[asyncio.Server] = None
         self.port: Optional[int] = None
         self.is_running_flag = False
         self.start_time: Optional[datetime] = None
-        self.active_connections: Set[asyncio.StreamReader] = set()
+        # Connection id -> (reader, writer)
+        self.active_connections: Dict[int, Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = {}
+        self._next_connection_id = 0
         self.total_messages_received = 0
-        self.parser = MavlinkParser()
+        # TCP already guarantees byte integrity, so CRC checking is opt-in here
+        self.validate_crc = validate_crc
+        self.parser = MavlinkParser(validate_crc=validate_crc)
         
         # Session tracking
-        self.sessions: Dict[int, MavlinkSession] = {}
+        self.sessions: Dict[Tuple[int, Any], MavlinkSession] = {}  # (system_id, peername) -> session
         self.daily_stats: Dict[str, MavlinkStatistics] = {}
+        
+        # Pending MongoDB inserts (only with USE_MONGO and MAVLINK_PERSIST_MESSAGES)
+        self.persist_messages = settings.USE_MONGO and settings.MAVLINK_PERSIST_MESSAGES
+        self._pending: List[MavlinkMessage] = []
+        self._flush_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_failures = 0
+        self.messages_dropped = 0
     
     def is_running(self) -> bool:
         """Check if receiver is running"""
@@ -57,6 +76,8 @@ class MavlinkReceiver:
             
             # Start background tasks
             asyncio.create_task(self._update_statistics())
+            if self.persist_messages:
+                self._flush_task = asyncio.create_task(self._flush_loop())
             
         except Exception as e:
             logger.error(f"Failed to start receiver: {e}")
@@ -70,14 +91,24 @@ class MavlinkReceiver:
         
         try:
             # Close all client connections
-            for reader in list(self.active_connections):
+            for _, writer in list(self.active_connections.values()):
                 try:
-                    reader.close()
+                    writer.close()
                 except Exception as e:
                     logger.error(f"Error closing client connection: {e}")
             
             self.active_connections.clear()
             
+            # Stop the bulk writer and persist whatever is still pending
+            if self._flush_task:
+                self._flush_task.cancel()
+                try:
+                    await self._flush_task
+                except asyncio.CancelledError:
+                    pass
+                self._flush_task = None
+                await self._flush()
+            
             # Close server
             if self.server:
                 self.server.close()
@@ -98,37 +129,31 @@ class MavlinkReceiver:
         client_addr = writer.get_extra_info('peername')
         logger.info(f"New client connected: {client_addr}")
         
-        self.active_connections.add(reader)
+        connection_id = self._next_connection_id
+        self._next_connection_id += 1
+        self.active_connections[connection_id] = (reader, writer)
         
         try:
-            buffer = bytearray()
-            
             while True:
-                # Read data from client
-                data = await reader.read(1024)
-                if not data:
-                    break
+                # STX, payload length and the v2 incompat flags are enough to size the frame
+                header = await reader.readexactly(3)
                 
-                buffer.extend(data)
+                # Resync one byte at a time until we are on a start-of-frame marker
+                while header[0] not in (0xFD, 0xFE):
+                    header = header[1:] + await reader.readexactly(1)
                 
-                # Process complete packets
-                while len(buffer) >= 8:  # Minimum packet size
-                    packet_length = self._get_packet_length(buffer)
-                    if packet_length is None or len(buffer) < packet_length:
-                        break
-                    
-                    # Extract complete packet
-                    packet = buffer[:packet_length]
-                    buffer = buffer[packet_length:]
-                    
-                    # Process packet
-                    await self._process_packet(packet, client_addr)
+                packet_length = self._get_packet_length(header)
+                packet = header + await reader.readexactly(packet_length - 3)
+                await self._process_packet(packet, client_addr, datetime.now(timezone.utc))
                     
+        except asyncio.IncompleteReadError:
+            # Client closed the connection (possibly mid-frame)
+            pass
         except Exception as e:
             logger.error(f"Error handling client {client_addr}: {e}")
         
         finally:
-            self.active_connections.discard(reader)
+            self.active_connections.pop(connection_id, None)
             writer.close()
             try:
                 await writer.wait_closed()
@@ -137,21 +162,18 @@ class MavlinkReceiver:
             
             logger.info(f"Client disconnected: {client_addr}")
     
-    def _get_packet_length(self, buffer: bytearray) -> Optional[int]:
-        """Get packet length from buffer"""
-        if len(buffer) < 8:
-            return None
-        
+    def _get_packet_length(self, header: bytes) -> Optional[int]:
+        """Get the full frame length from its first 3 bytes (STX, payload length, incompat flags)"""
         # Check MAVLink v1 vs v2
-        if buffer[0] == 0xFE:  # MAVLink v1
-            return buffer[1] + 8
-        elif buffer[0] == 0xFD:  # MAVLink v2
-            return buffer[1] + 10
+        if header[0] == 0xFE:  # MAVLink v1: 6-byte header + payload + 2-byte CRC
+            return header[1] + 8
+        elif header[0] == 0xFD:  # MAVLink v2: 10-byte header + payload + 2-byte CRC (+13-byte signature)
+            return header[1] + (25 if header[2] & 0x01 else 12)
         else:
             return None
     
-    async def _process_packet(self, packet: bytes, client_addr):
-        """Process MAVLink packet"""
+    async def _process_packet(self, packet: bytes, client_addr, now: datetime):
+        """Process MAVLink packet received at now"""
         try:
             # Parse packet
             parsed = self.parser.parse_packet(packet)
@@ -159,23 +181,25 @@ class MavlinkReceiver:
                 logger.warning(f"Failed to parse packet from {client_addr}")
                 return
             
-            # Create message record
-            message = MavlinkMessage(
+            # Create message record (fields come from the parser, so validation is skipped)
+            message = make_mavlink_message(
                 message_id=parsed['message_id'],
                 system_id=parsed['system_id'],
                 component_id=parsed['component_id'],
                 sequence=parsed['sequence'],
                 payload=parsed['payload'],
                 parsed_data=parsed.get('parsed_data', {}),
-                timestamp=datetime.now(timezone.utc),
+                timestamp=now,
                 client_address=str(client_addr),
                 packet_length=len(packet),
                 is_valid=parsed.get('is_valid', True)
             )
             
-            # Save to database (temporarily disabled for testing)
-            # async with mongo_manager.use_source("mavlink"):
-            #     await message.save()
+            # Queue for bulk insert instead of one save() round-trip per message
+            if self.persist_messages:
+                self._pending.append(message)
+                if len(self._pending) >= self.FLUSH_SIZE:
+                    self._flush_event.set()
             
             # Forward to MQTT
             try:
@@ -190,7 +214,7 @@ class MavlinkReceiver:
                 logger.error(f"Failed to forward to MQTT: {mqtt_error}")
             
             # Update session tracking
-            await self._update_session(parsed['system_id'], client_addr)
+            await self._update_session(parsed['system_id'], client_addr, now)
             
             # Update statistics
             self.total_messages_received += 1
@@ -200,11 +224,50 @@ class MavlinkReceiver:
         except Exception as e:
             logger.error(f"Error processing packet: {e}")
     
-    async def _update_session(self, system_id: int, client_addr):
+    async def _flush_loop(self):
+        """Flush pending messages when the batch fills up or the interval elapses"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self._flush()
+    
+    async def _flush(self):
+        """Write all pending messages with a single insert_many"""
+        if not self._pending:
+            return
+        
+        batch, self._pending = self._pending, []
+        try:
+            from app.db.mongo_multi import mongo_manager
+            async with mongo_manager.use_source("mavlink"):
+                await MavlinkMessage.insert_many(batch)
+        except Exception as e:
+            self._flush_failures += 1
+            if self._flush_failures > self.MAX_FLUSH_RETRIES:
+                self._flush_failures = 0
+                self.messages_dropped += len(batch)
+                logger.error(f"Dropping {len(batch)} MAVLink messages after {self.MAX_FLUSH_RETRIES} "
+                             f"failed insert retries: {e}")
+                return
+            
+            # Put the batch back in front of anything queued meanwhile, keeping the newest MAX_PENDING
+            self._pending = batch + self._pending
+            overflow = len(self._pending) - self.MAX_PENDING
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.messages_dropped += overflow
+            logger.warning(f"Failed to insert {len(batch)} MAVLink messages "
+                           f"(attempt {self._flush_failures}/{self.MAX_FLUSH_RETRIES}), will retry: {e}")
+        else:
+            self._flush_failures = 0
+    
+    async def _update_session(self, system_id: int, client_addr, now: datetime):
         """Update session tracking for system"""
         try:
-            session_key = f"{system_id}_{client_addr}"
-            now = datetime.now(timezone.utc)
+            session_key = (system_id, client_addr)
             
             if session_key not in self.sessions:
                 # Create new session
@@ -280,7 +343,10 @@ class MavlinkReceiver:
             "active_connections": len(self.active_connections),
             "total_messages_received": self.total_messages_received,
             "active_sessions": len([s for s in self.sessions.values() if s.is_active]),
-            "total_sessions": len(self.sessions)
+            "total_sessions": len(self.sessions),
+            "persist_messages": self.persist_messages,
+            "pending_messages": len(self._pending),
+            "messages_dropped": self.messages_dropped
         }
 
 
@@ -1,9 +1,15 @@
 from pymavlink import mavutil
 
-connection = mavutil.mavlink_connection('udp:127.0.0.1:14550')
 
-# Read and print all received messages
-while True:
-    message = connection.recv_match()
-    if message:
-        print(message)
\ No newline at end of file
+def main():
+    connection = mavutil.mavlink_connection('udp:127.0.0.1:14550')
+
+    # Read and print all received messages; block in recv_match instead of polling
+    while True:
+        message = connection.recv_match(blocking=True, timeout=1.0)
+        if message is not None:
+            print(message)
+
+
+if __name__ == "__main__":
+    main()
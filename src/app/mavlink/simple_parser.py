@@ -6,6 +6,8 @@ import base64
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
+from app.config import settings
+
 
 class SimpleMavlinkParser:
     """Simple MAVLink packet parser"""
@@ -105,7 +107,9 @@ class SimpleMavlinkParser:
             self.packet_count += 1
             self.sample_rate_counter += 1
             if self.sample_rate_counter >= self.sample_rate_interval:
-                self._print_formatted_message(message, data)
+                # Sampled packet dump, only with MAVLINK_DEBUG enabled
+                if settings.MAVLINK_DEBUG:
+                    self._print_formatted_message(message, data)
                 self.sample_rate_counter = 0
             
             return message
@@ -5,29 +5,72 @@ Automatically receives MAVLink packets from UDP clients
 import asyncio
 import socket
 import logging
+from collections import deque
+from itertools import islice
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 import base64
 
+from app.config import settings
 from app.mavlink.advanced_parser import AdvancedMavlinkParser
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert a time.time_ns() stamp to an aware UTC datetime"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
+
+
+class _DatagramQueueProtocol(asyncio.DatagramProtocol):
+    """Datagram endpoint for event loops that cannot watch raw sockets (e.g. the Windows Proactor loop)"""
+    
+    def __init__(self, receiver: "MavlinkUdpReceiver"):
+        self.receiver = receiver
+    
+    def datagram_received(self, data: bytes, addr: tuple):
+        self.receiver._on_datagram(data, addr)
+    
+    def error_received(self, exc: Exception):
+        logger.error(f"Socket receive error: {exc}")
+
+
 class MavlinkUdpReceiver:
     """UDP receiver for MAVLink data"""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 14550):
+    # Datagrams drained per wake-up of the receive loop
+    RECV_BATCH = 64
+    # Size of each preallocated receive buffer (larger than any MAVLink datagram)
+    RECV_BUFSIZE = 2048
+    # Most recent parsed messages kept in memory; older ones are dropped
+    MAX_STORED_MESSAGES = 10000
+    
+    def __init__(self, host: str = "0.0.0.0", port: int = 14550,
+                 parser: Optional[AdvancedMavlinkParser] = None,
+                 rcvbuf: Optional[int] = None, reuse_port: Optional[bool] = None):
         self.host = host
         self.port = port
-        self.parser = AdvancedMavlinkParser()
+        # Kernel receive queue requested for the socket (capped by net.core.rmem_max) to absorb bursts
+        self.rcvbuf = settings.MAVLINK_UDP_RCVBUF if rcvbuf is None else rcvbuf
+        self.reuse_port = settings.MAVLINK_UDP_REUSEPORT if reuse_port is None else reuse_port
+        self.parser = parser or AdvancedMavlinkParser()
         self.is_running = False
         self.socket = None
-        self.messages = []
-        self.sessions = []
+        # Set when the loop has no add_reader and the socket is driven by a datagram endpoint
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self.messages = deque(maxlen=self.MAX_STORED_MESSAGES)
+        self.sessions: Dict[tuple, Dict[str, Any]] = {}  # (system_id, addr) -> session
+        self._addr_cache: Dict[tuple, str] = {}  # addr -> "host:port"
+        self._debug_counter = 0
+        self._parse_fail_count = 0
         self.task = None
+        # One reusable receive buffer per batch slot; datagrams are handed on as views into them
+        self._rx_bufs = [bytearray(self.RECV_BUFSIZE) for _ in range(self.RECV_BATCH)]
+        self._rx_views = [memoryview(buf) for buf in self._rx_bufs]
+        # Datagrams drained by the selector callback, waiting for _receive_loop.
+        # Entry k lives in buffer k, so a buffer is reused only after the batch is processed.
+        self._rx_pending = []
+        self._rx_ready = asyncio.Event()
         
     async def start(self):
         """Start UDP receiver"""
@@ -39,14 +82,31 @@ class MavlinkUdpReceiver:
             # Create UDP socket
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Opt-in only: with SO_REUSEPORT the kernel spreads datagrams across every process
+            # bound to the port, so each one sees only part of the traffic
+            if self.reuse_port and hasattr(socket, "SO_REUSEPORT"):
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            if self.rcvbuf:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
             self.socket.bind((self.host, self.port))
             self.socket.setblocking(False)
             
             self.is_running = True
             logger.info(f"UDP receiver started on {self.host}:{self.port}")
             
-            # Start receiving loop
+            # Read directly on the event loop thread whenever the selector reports the socket readable;
+            # loops without add_reader (Proactor on Windows) get a datagram endpoint on the same socket
+            loop = asyncio.get_running_loop()
+            try:
+                loop.add_reader(self.socket.fileno(), self._on_readable)
+            except NotImplementedError:
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _DatagramQueueProtocol(self), sock=self.socket
+                )
+            
+            # Start receiving loop and the parser's batched GPS publisher
             self.task = asyncio.create_task(self._receive_loop())
+            self.parser.start_gps_publisher()
             
         except Exception as e:
             logger.error(f"Failed to start UDP receiver: {e}")
@@ -66,25 +126,31 @@ class MavlinkUdpReceiver:
             except asyncio.CancelledError:
                 pass
         
+        await self.parser.stop_gps_publisher()
+        
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        elif self.socket:
+            asyncio.get_running_loop().remove_reader(self.socket.fileno())
         if self.socket:
             self.socket.close()
             
         logger.info("UDP receiver stopped")
     
     async def _receive_loop(self):
-        """Main receive loop"""
-        loop = asyncio.get_event_loop()
-        
+        """Main receive loop: process whatever the selector callback has drained"""
         while self.is_running:
             try:
-                # Use asyncio to wait for data
-                data, addr = await loop.run_in_executor(
-                    None, 
-                    self._receive_data
-                )
+                await self._rx_ready.wait()
+                self._rx_ready.clear()
                 
-                if data:
-                    await self._process_packet(data, addr)
+                try:
+                    for data, addr in self._rx_pending:
+                        await self._process_packet(data, addr)
+                finally:
+                    # Release the receive buffers for the next drain
+                    self._rx_pending.clear()
                     
             except asyncio.CancelledError:
                 break
@@ -92,83 +158,83 @@ class MavlinkUdpReceiver:
                 logger.error(f"Error in receive loop: {e}")
                 await asyncio.sleep(0.1)
     
-    def _receive_data(self) -> tuple:
-        """Receive data from socket (blocking)"""
+    def _on_readable(self):
+        """Selector callback: drain datagrams into the free receive buffers without blocking"""
+        pending = self._rx_pending
         try:
-            data, addr = self.socket.recvfrom(1024)
-            return data, addr
+            for slot in range(len(pending), self.RECV_BATCH):
+                nbytes, addr = self.socket.recvfrom_into(self._rx_bufs[slot], self.RECV_BUFSIZE)
+                pending.append((self._rx_views[slot][:nbytes], addr))
         except BlockingIOError:
-            return None, None
+            pass
         except Exception as e:
             logger.error(f"Socket receive error: {e}")
-            return None, None
+        
+        if pending:
+            self._rx_ready.set()
     
-    async def _process_packet(self, data: bytes, addr: tuple):
-        """Process received MAVLink packet"""
+    def _on_datagram(self, data: bytes, addr: tuple):
+        """Datagram endpoint callback: queue the datagram for _receive_loop"""
+        self._rx_pending.append((data, addr))
+        self._rx_ready.set()
+    
+    async def _process_packet(self, data: memoryview, addr: tuple):
+        """Process received MAVLink packet (a view into a reusable receive buffer, or bytes from the datagram endpoint)"""
         try:
-            client_address = f"{addr[0]}:{addr[1]}"
+            client_address = self._addr_cache.get(addr)
+            if client_address is None:
+                client_address = self._addr_cache[addr] = f"{addr[0]}:{addr[1]}"
 
             # Debug: Log raw data occasionally
-            if not hasattr(self, '_debug_counter'):
-                self._debug_counter = 0
             self._debug_counter += 1
             
-            if self._debug_counter % 50 == 1:  # Log every 50th packet
-                logger.info(f"DEBUG: Received {len(data)} bytes from {client_address}")
-                logger.info(f"DEBUG: Raw data (first 20 bytes): {data[:20].hex()}")
+            # Log every 50th packet, and only build the messages when DEBUG is enabled
+            if self._debug_counter % 50 == 1 and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Received {len(data)} bytes from {client_address}")
+                logger.debug(f"Raw data (first 20 bytes): {data[:20].hex()}")
                 if len(data) >= 10:
-                    logger.info(f"DEBUG: First byte: 0x{data[0]:02x}, Payload length: {data[1]}")
+                    logger.debug(f"First byte: 0x{data[0]:02x}, Payload length: {data[1]}")
 
             # Split possible multiple MAVLink v2 packets within this UDP datagram
             packets = self._split_mavlink_packets(data)
 
             if not packets:
                 # Only log parse failures occasionally to reduce spam
-                if hasattr(self, '_parse_fail_count'):
-                    self._parse_fail_count += 1
-                else:
-                    self._parse_fail_count = 1
+                self._parse_fail_count += 1
                 if self._parse_fail_count % 100 == 0:
                     logger.warning(f"Failed to parse {self._parse_fail_count} MAVLink packets from {client_address}")
                     if self._parse_fail_count == 100:  # First failure, show debug info
-                        logger.info(f"DEBUG: Sample failed data: {data[:50].hex()}")
+                        logger.debug(f"Sample failed data: {data[:50].hex()}")
                 return
 
             for pkt in packets:
                 message = self.parser.parse_packet(pkt, client_address)
                 if not message:
-                    if hasattr(self, '_parse_fail_count'):
-                        self._parse_fail_count += 1
-                    else:
-                        self._parse_fail_count = 1
+                    self._parse_fail_count += 1
                     continue
 
                 # Store message
                 self.messages.append(message)
 
-                # Update or create session
-                session_key = f"{message['system_id']}_{client_address}"
-                existing_session = next(
-                    (s for s in self.sessions if s['key'] == session_key),
-                    None
-                )
+                # Update or create session; the string key is only formatted for new sessions
+                existing_session = self.sessions.get((message['system_id'], addr))
 
                 if existing_session:
-                    existing_session['last_seen'] = message['timestamp']
+                    existing_session['last_seen'] = message['timestamp_ns']
                     existing_session['message_count'] += 1
                 else:
-                    self.sessions.append({
-                        'key': session_key,
+                    self.sessions[(message['system_id'], addr)] = {
+                        'key': f"{message['system_id']}_{client_address}",
                         'system_id': message['system_id'],
                         'client_address': client_address,
-                        'first_seen': message['timestamp'],
-                        'last_seen': message['timestamp'],
+                        'first_seen': message['timestamp_ns'],
+                        'last_seen': message['timestamp_ns'],
                         'message_count': 1,
                         'is_active': True
-                    })
+                    }
 
             # Log aggregated results occasionally
-            if hasattr(self, '_parse_fail_count') and self._parse_fail_count and self._parse_fail_count % 100 == 0:
+            if self._parse_fail_count and self._parse_fail_count % 100 == 0:
                 logger.warning(f"Failed to parse {self._parse_fail_count} MAVLink packets from {client_address}")
 
         except Exception as e:
@@ -176,45 +242,55 @@ class MavlinkUdpReceiver:
 
     def _split_mavlink_packets(self, data: bytes) -> list:
         """Scan a UDP datagram for one or more MAVLink v2 packets and return list of slices.
-        Handle both complete and truncated packets.
+        Handle both complete and truncated packets. Slices are memoryviews over one copy of the datagram.
         """
         packets = []
-        i = 0
-        length = len(data)
+        # memoryview has no find(), and searching view.obj would ignore a slice's offset;
+        # copy the datagram once (at most RECV_BUFSIZE bytes) and search that
+        raw = data.tobytes() if isinstance(data, memoryview) else data
+        length = len(raw)
+        view = memoryview(raw)
+        find = raw.find
+        # Find next v2 STX with a C-level search instead of stepping byte by byte
+        i = find(b'\xfd', 0, length)
         
-        while i + 10 <= length:
-            # Find next v2 STX
-            if data[i] != 0xFD:
-                i += 1
-                continue
-                
-            # Need at least header
-            if i + 10 > length:
-                break
-                
-            payload_len = data[i + 1]
+        append = packets.append
+        last_header = length - 10
+        
+        # Need at least header
+        while 0 <= i <= last_header:
             # header is 10 bytes, payload follows
-            total_no_crc = 10 + payload_len
-            
-            if i + total_no_crc <= length:
-                # Complete packet
-                packets.append(data[i:i + total_no_crc])
-                i += total_no_crc
-            else:
+            end = i + 10 + view[i + 1]
+            if end > length:
                 # Truncated packet - include what we have
-                if i + 10 <= length:
-                    packets.append(data[i:length])
+                append(view[i:length])
                 break
+            
+            # Complete packet
+            append(view[i:end])
+            i = find(b'\xfd', end, length)
                 
         return packets
     
     def get_messages(self, limit: int = 100) -> list:
         """Get stored messages"""
-        return self.messages[-limit:] if limit > 0 else self.messages
+        messages = islice(self.messages, max(0, len(self.messages) - limit), None) if limit > 0 else self.messages
+        # Timestamps are stored as integers on the hot path and converted only when read
+        return [
+            {**message, "timestamp": _ns_to_datetime(message["timestamp_ns"])}
+            for message in messages
+        ]
     
     def get_sessions(self) -> list:
         """Get active sessions"""
-        return self.sessions
+        return [
+            {
+                **session,
+                "first_seen": _ns_to_datetime(session["first_seen"]),
+                "last_seen": _ns_to_datetime(session["last_seen"]),
+            }
+            for session in self.sessions.values()
+        ]
     
     def get_stats(self) -> Dict[str, Any]:
         """Get receiver statistics"""
@@ -1,10 +1,11 @@
 """
 MAVLink Data Models for MongoDB
 Simplified models to avoid Pydantic field conflicts
+Structured fields are stored as native BSON subdocuments/arrays
 """
 from beanie import Document, Indexed
 from pydantic import Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone, date
 
 
@@ -15,8 +16,8 @@ class MavlinkMessage(Document):
     system_id: int = Indexed()
     component_id: int
     sequence: int
-    payload: bytes
-    parsed_data: str = Field(default="{}")  # JSON string instead of Dict
+    payload: Optional[bytes] = None  # Raw bytes are only kept when the payload could not be decoded
+    parsed_data: Dict[str, Any] = Field(default_factory=dict)
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     client_address: str
     packet_length: int
@@ -33,6 +34,15 @@ class MavlinkMessage(Document):
         ]
 
 
+def make_mavlink_message(**fields) -> MavlinkMessage:
+    """Build a MavlinkMessage without pydantic validation
+
+    Only for ingest paths whose fields come from the MAVLink parser and already
+    have the right types; external input must go through normal validation.
+    """
+    return MavlinkMessage.model_construct(**fields)
+
+
 class MavlinkSession(Document):
     """MAVLink session tracking model"""
     
@@ -63,8 +73,8 @@ class MavlinkStatistics(Document):
     unique_systems: int = 0
     active_sessions: int = 0
     last_updated: datetime
-    message_type_counts_json: str = Field(default="{}")  # JSON string instead of Dict
-    system_message_counts_json: str = Field(default="{}")  # JSON string instead of Dict
+    message_type_counts: Dict[str, int] = Field(default_factory=dict)
+    system_message_counts: Dict[str, int] = Field(default_factory=dict)
     
     class Settings:
         name = "mavlink_statistics"
@@ -84,7 +94,7 @@ class MavlinkSystemInfo(Document):
     first_seen: datetime
     last_seen: datetime
     total_messages: int = 0
-    message_type_list_json: str = Field(default="[]")  # JSON string instead of List
+    message_type_list: List[str] = Field(default_factory=list)
     is_active: bool = True
     firmware_version: Optional[str] = None
     hardware_version: Optional[str] = None
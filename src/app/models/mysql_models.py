@@ -2,8 +2,9 @@
 MySQL数据模型定义
 支持多租户和ruoyi_vue_pro数据库的通用数据模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, DECIMAL, JSON
+from sqlalchemy import Column, Integer, SmallInteger, Float, String, Text, DateTime, Boolean, DECIMAL, JSON
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
 from datetime import datetime
 from typing import Optional
@@ -109,17 +110,36 @@ class VehicleData(BaseModel):
     __tablename__ = "vehicle_data"
     
     vehicle_id = Column(String(50), nullable=False, comment="车辆ID")
-    latitude = Column(DECIMAL(10, 8), nullable=True, comment="纬度")
-    longitude = Column(DECIMAL(11, 8), nullable=True, comment="经度")
-    altitude = Column(DECIMAL(10, 4), nullable=True, comment="海拔")
-    speed = Column(DECIMAL(8, 4), nullable=True, comment="速度")
-    heading = Column(DECIMAL(6, 2), nullable=True, comment="航向")
-    battery_level = Column(DECIMAL(5, 2), nullable=True, comment="电量百分比")
+    # 经纬度按MAVLink惯例以 度*1e7 的整数存储
+    latitude = Column(Integer, nullable=True, comment="纬度(度*1e7)")
+    longitude = Column(Integer, nullable=True, comment="经度(度*1e7)")
+    altitude = Column(Float, nullable=True, comment="海拔")
+    speed = Column(Float, nullable=True, comment="速度")
+    heading = Column(Float, nullable=True, comment="航向")
+    battery_level = Column(SmallInteger, nullable=True, comment="电量百分比")
     signal_strength = Column(Integer, nullable=True, comment="信号强度")
     status = Column(String(20), nullable=True, comment="状态")
     raw_data = Column(JSON, nullable=True, comment="原始数据JSON")
     tenant_id = Column(Integer, nullable=True, comment="租户ID")
     
+    @hybrid_property
+    def latitude_deg(self) -> Optional[float]:
+        """纬度（度）"""
+        return self.latitude / 1e7 if self.latitude is not None else None
+    
+    @latitude_deg.setter
+    def latitude_deg(self, value: Optional[float]):
+        self.latitude = round(value * 1e7) if value is not None else None
+    
+    @hybrid_property
+    def longitude_deg(self) -> Optional[float]:
+        """经度（度）"""
+        return self.longitude / 1e7 if self.longitude is not None else None
+    
+    @longitude_deg.setter
+    def longitude_deg(self, value: Optional[float]):
+        self.longitude = round(value * 1e7) if value is not None else None
+    
     def __repr__(self):
         return f"<VehicleData(id={self.id}, vehicle_id={self.vehicle_id}, tenant_id={self.tenant_id})>"
 
@@ -12,20 +12,40 @@ Architecture:
 - Plugin-based detector system
 """
 
+import importlib
+
 from .core.base import BaseRealtimeDetector, BaseStreamProvider, DetectorType, StreamProtocol, StreamConfig
 from .core.factory import DetectorFactory, StreamProviderFactory
-from .detectors.yolo_detector import YOLOv11Detector
-from .detectors.custom_detector import CustomDetector
-from .detectors.multi_gpu_detector import MultiGPUYOLOv11Detector
-from .streams.rtsp_provider import RTSPStreamProvider
-from .streams.rtmp_provider import RTMPStreamProvider
-from .streams.http_provider import HTTPStreamProvider
-from .streams.file_provider import FileStreamProvider
 from .service import RealtimeAIService, ServiceConfig, create_rtsp_yolo_service, create_rtmp_yolo_service
 
 # Import registry to auto-register all components
 from . import registry
 
+# Detector and stream classes pull in torch/ultralytics/OpenCV, so they are
+# imported on first attribute access (PEP 562) instead of with the package
+_LAZY = {
+    "YOLOv11Detector": ".detectors.yolo_detector",
+    "CustomDetector": ".detectors.custom_detector",
+    "MultiGPUYOLOv11Detector": ".detectors.multi_gpu_detector",
+    "RTSPStreamProvider": ".streams.rtsp_provider",
+    "RTMPStreamProvider": ".streams.rtmp_provider",
+    "HTTPStreamProvider": ".streams.http_provider",
+    "FileStreamProvider": ".streams.file_provider",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return list(globals()) + list(_LAZY)
+
 __all__ = [
     "BaseRealtimeDetector",
     "BaseStreamProvider", 
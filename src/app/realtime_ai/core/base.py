@@ -6,12 +6,17 @@ extensible real-time AI recognition framework.
 """
 
 from abc import ABC, abstractmethod
+from collections import Counter
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, Any, List, Optional, AsyncIterator, Union
 from enum import Enum
 import asyncio
 import numpy as np
 
+# Shared warm-up input: only shape and dtype matter, so one zero frame is reused (never modify it)
+_WARMUP_FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
 
 class StreamProtocol(str, Enum):
     """Supported streaming protocols"""
@@ -39,7 +44,7 @@ class DetectorType(str, Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BoundingBox:
     """Bounding box representation"""
     x1: float
@@ -64,7 +69,7 @@ class BoundingBox:
         return self.width * self.height
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Detection:
     """Single object detection result"""
     bbox: BoundingBox
@@ -74,7 +79,7 @@ class Detection:
     additional_info: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class DetectionResult:
     """Complete detection result for a frame"""
     frame_id: int
@@ -93,15 +98,32 @@ class DetectionResult:
     def confidence_scores(self) -> List[float]:
         return [det.confidence for det in self.detections]
     
-    @property
+    @cached_property
     def class_counts(self) -> Dict[str, int]:
-        counts = {}
-        for det in self.detections:
-            counts[det.class_name] = counts.get(det.class_name, 0) + 1
-        return counts
+        return dict(Counter(det.class_name for det in self.detections))
+    
+    # Column (SoA) views of the detections for vectorized IoU/NMS/drawing code
+    @cached_property
+    def boxes_xyxy(self) -> np.ndarray:
+        """(N, 4) float32 array of x1, y1, x2, y2"""
+        boxes = np.empty((len(self.detections), 4), dtype=np.float32)
+        for i, det in enumerate(self.detections):
+            bbox = det.bbox
+            boxes[i] = (bbox.x1, bbox.y1, bbox.x2, bbox.y2)
+        return boxes
+    
+    @cached_property
+    def scores(self) -> np.ndarray:
+        """(N,) float32 array of confidences"""
+        return np.fromiter((det.confidence for det in self.detections), dtype=np.float32, count=len(self.detections))
+    
+    @cached_property
+    def class_ids(self) -> np.ndarray:
+        """(N,) int32 array of class ids"""
+        return np.fromiter((det.class_id for det in self.detections), dtype=np.int32, count=len(self.detections))
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamConfig:
     """Stream configuration"""
     url: str
@@ -214,8 +236,7 @@ class BaseRealtimeDetector(ABC):
             await self.load_model()
         
         if dummy_frame is None:
-            # Create a dummy frame for warm-up
-            dummy_frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+            dummy_frame = _WARMUP_FRAME
         
         try:
             await self.detect_frame(dummy_frame, 0)
@@ -5,7 +5,8 @@ Implements the Factory Pattern for easy instantiation and registration
 of different detector and stream provider types.
 """
 
-from typing import Dict, Type, Any, Optional
+import importlib
+from typing import Dict, Type, Any, Optional, Union
 from .base import (
     BaseRealtimeDetector, 
     BaseStreamProvider, 
@@ -16,14 +17,22 @@ from .base import (
 from .exceptions import ConfigurationException
 
 
+def _resolve(target: Union[type, str]) -> type:
+    """Return a registered class, importing it first if it was registered as "module:Class" """
+    if not isinstance(target, str):
+        return target
+    module_name, _, class_name = target.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 class DetectorFactory:
     """Factory for creating AI detectors"""
     
-    _detectors: Dict[DetectorType, Type[BaseRealtimeDetector]] = {}
+    _detectors: Dict[DetectorType, Union[Type[BaseRealtimeDetector], str]] = {}
     
     @classmethod
-    def register(cls, detector_type: DetectorType, detector_class: Type[BaseRealtimeDetector]):
-        """Register a new detector type"""
+    def register(cls, detector_type: DetectorType, detector_class: Union[Type[BaseRealtimeDetector], str]):
+        """Register a new detector type (a class, or a "module:Class" path imported on first use)"""
         cls._detectors[detector_type] = detector_class
     
     @classmethod
@@ -37,7 +46,7 @@ class DetectorFactory:
                 config_key="detector_type"
             )
         
-        detector_class = cls._detectors[detector_type]
+        detector_class = cls._detectors[detector_type] = _resolve(cls._detectors[detector_type])
         return detector_class(model_config)
     
     @classmethod
@@ -54,11 +63,11 @@ class DetectorFactory:
 class StreamProviderFactory:
     """Factory for creating stream providers"""
     
-    _providers: Dict[StreamProtocol, Type[BaseStreamProvider]] = {}
+    _providers: Dict[StreamProtocol, Union[Type[BaseStreamProvider], str]] = {}
     
     @classmethod
-    def register(cls, protocol: StreamProtocol, provider_class: Type[BaseStreamProvider]):
-        """Register a new stream provider"""
+    def register(cls, protocol: StreamProtocol, provider_class: Union[Type[BaseStreamProvider], str]):
+        """Register a new stream provider (a class, or a "module:Class" path imported on first use)"""
         cls._providers[protocol] = provider_class
     
     @classmethod
@@ -72,7 +81,7 @@ class StreamProviderFactory:
                 config_key="stream_protocol"
             )
         
-        provider_class = cls._providers[config.protocol]
+        provider_class = cls._providers[config.protocol] = _resolve(cls._providers[config.protocol])
         return provider_class(config)
     
     @classmethod
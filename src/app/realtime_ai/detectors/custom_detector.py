@@ -74,7 +74,7 @@ class CustomDetector(BaseRealtimeDetector):
             if asyncio.iscoroutinefunction(self.load_model_callback):
                 self.custom_model = await self.load_model_callback(self.model_config)
             else:
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 self.custom_model = await loop.run_in_executor(
                     None, self.load_model_callback, self.model_config
                 )
@@ -98,7 +98,7 @@ class CustomDetector(BaseRealtimeDetector):
                 if asyncio.iscoroutinefunction(self.unload_model_callback):
                     await self.unload_model_callback(self.custom_model)
                 else:
-                    loop = asyncio.get_event_loop()
+                    loop = asyncio.get_running_loop()
                     await loop.run_in_executor(
                         None, self.unload_model_callback, self.custom_model
                     )
@@ -127,7 +127,7 @@ class CustomDetector(BaseRealtimeDetector):
                 if asyncio.iscoroutinefunction(self.preprocess_callback):
                     processed_frame = await self.preprocess_callback(frame)
                 else:
-                    loop = asyncio.get_event_loop()
+                    loop = asyncio.get_running_loop()
                     processed_frame = await loop.run_in_executor(
                         None, self.preprocess_callback, frame
                     )
@@ -138,7 +138,7 @@ class CustomDetector(BaseRealtimeDetector):
                     self.custom_model, processed_frame, self.model_config
                 )
             else:
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 raw_results = await loop.run_in_executor(
                     None, self.inference_callback, 
                     self.custom_model, processed_frame, self.model_config
@@ -150,7 +150,7 @@ class CustomDetector(BaseRealtimeDetector):
                 if asyncio.iscoroutinefunction(self.postprocess_callback):
                     processed_results = await self.postprocess_callback(raw_results)
                 else:
-                    loop = asyncio.get_event_loop()
+                    loop = asyncio.get_running_loop()
                     processed_results = await loop.run_in_executor(
                         None, self.postprocess_callback, raw_results
                     )
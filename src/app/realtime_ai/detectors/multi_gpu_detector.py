@@ -141,8 +141,7 @@ class MultiGPUYOLOv11Detector(YOLOv11Detector):
             logger.info(f"Warming up model on GPU {device_id}...")
             model = self.models[device_id]
             
-            # Create dummy input on the correct device
-            dummy_frame = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+            dummy_frame = self.WARMUP_FRAME
             
             # Set device context
             with torch.cuda.device(device_id):
@@ -193,7 +192,7 @@ class MultiGPUYOLOv11Detector(YOLOv11Detector):
             start_time = time.time()
             
             # Run inference on selected device
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             result = await loop.run_in_executor(
                 self.thread_pool,
                 self._inference_on_device,
@@ -26,6 +26,9 @@ from ..core.exceptions import ModelLoadException, ModelInferenceException
 class YOLOv11Detector(BaseRealtimeDetector):
     """YOLOv11 detector with support for different model variants"""
     
+    # Shared warm-up input: only shape and dtype matter, so one zero frame is reused (never modify it)
+    WARMUP_FRAME = np.zeros((640, 640, 3), dtype=np.uint8)
+    
     # Model variant specifications
     MODEL_VARIANTS = {
         DetectorType.YOLOV11_NANO: {
@@ -164,8 +167,7 @@ class YOLOv11Detector(BaseRealtimeDetector):
         try:
             logger.info("Warming up model for optimal performance...")
             
-            # Create dummy input
-            dummy_frame = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+            dummy_frame = self.WARMUP_FRAME
             
             # Perform warmup inferences
             warmup_times = []
@@ -173,7 +175,7 @@ class YOLOv11Detector(BaseRealtimeDetector):
                 start_time = time.time()
                 
                 # Run dummy inference
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 await loop.run_in_executor(None, self._inference_sync, dummy_frame)
                 
                 warmup_time = time.time() - start_time
@@ -250,7 +252,7 @@ class YOLOv11Detector(BaseRealtimeDetector):
             start_time = time.time()
             
             # Run inference in executor to avoid blocking
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             results = await loop.run_in_executor(
                 None, 
                 self._inference_sync, 
@@ -2,23 +2,25 @@
 Registry for detectors and stream providers.
 
 Automatically registers all available detectors and stream providers
-with their respective factories.
+with their respective factories. Classes are registered by import path so
+that torch/ultralytics/OpenCV are only loaded when a component is first created.
 """
 
 from .core.factory import DetectorFactory, StreamProviderFactory
 from .core.base import DetectorType, StreamProtocol
 
-# Import all detectors
-from .detectors.yolo_detector import YOLOv11Detector
-from .detectors.custom_detector import CustomDetector
-from .detectors.multi_gpu_detector import MultiGPUYOLOv11Detector
-from .detectors.vehicle_detector import VehicleDetector, MultiVehicleTypeDetector
+# All detectors
+_YOLOV11_DETECTOR = f"{__package__}.detectors.yolo_detector:YOLOv11Detector"
+_CUSTOM_DETECTOR = f"{__package__}.detectors.custom_detector:CustomDetector"
+_MULTI_GPU_YOLOV11_DETECTOR = f"{__package__}.detectors.multi_gpu_detector:MultiGPUYOLOv11Detector"
+_VEHICLE_DETECTOR = f"{__package__}.detectors.vehicle_detector:VehicleDetector"
+_MULTI_VEHICLE_TYPE_DETECTOR = f"{__package__}.detectors.vehicle_detector:MultiVehicleTypeDetector"
 
-# Import all stream providers  
-from .streams.rtsp_provider import RTSPStreamProvider
-from .streams.rtmp_provider import RTMPStreamProvider
-from .streams.http_provider import HTTPStreamProvider
-from .streams.file_provider import FileStreamProvider
+# All stream providers
+_RTSP_STREAM_PROVIDER = f"{__package__}.streams.rtsp_provider:RTSPStreamProvider"
+_RTMP_STREAM_PROVIDER = f"{__package__}.streams.rtmp_provider:RTMPStreamProvider"
+_HTTP_STREAM_PROVIDER = f"{__package__}.streams.http_provider:HTTPStreamProvider"
+_FILE_STREAM_PROVIDER = f"{__package__}.streams.file_provider:FileStreamProvider"
 
 
 def register_all():
@@ -32,7 +34,7 @@ def register_all():
         DetectorType.YOLOV11_LARGE,
         DetectorType.YOLOV11_XLARGE
     ]:
-        DetectorFactory.register(detector_type, YOLOv11Detector)
+        DetectorFactory.register(detector_type, _YOLOV11_DETECTOR)
     
     # Register multi-GPU detectors
     for detector_type in [
@@ -42,21 +44,21 @@ def register_all():
         DetectorType.MULTI_GPU_YOLOV11_LARGE,
         DetectorType.MULTI_GPU_YOLOV11_XLARGE
     ]:
-        DetectorFactory.register(detector_type, MultiGPUYOLOv11Detector)
+        DetectorFactory.register(detector_type, _MULTI_GPU_YOLOV11_DETECTOR)
     
     # Register vehicle detectors
-    DetectorFactory.register(DetectorType.VEHICLE_DETECTOR, VehicleDetector)
-    DetectorFactory.register(DetectorType.MULTI_VEHICLE_TYPE, MultiVehicleTypeDetector)
+    DetectorFactory.register(DetectorType.VEHICLE_DETECTOR, _VEHICLE_DETECTOR)
+    DetectorFactory.register(DetectorType.MULTI_VEHICLE_TYPE, _MULTI_VEHICLE_TYPE_DETECTOR)
     
     # Register custom detector
-    DetectorFactory.register(DetectorType.CUSTOM, CustomDetector)
+    DetectorFactory.register(DetectorType.CUSTOM, _CUSTOM_DETECTOR)
     
     # Register stream providers
-    StreamProviderFactory.register(StreamProtocol.RTSP, RTSPStreamProvider)
-    StreamProviderFactory.register(StreamProtocol.RTMP, RTMPStreamProvider)
-    StreamProviderFactory.register(StreamProtocol.HTTP, HTTPStreamProvider)
-    StreamProviderFactory.register(StreamProtocol.HTTPS, HTTPStreamProvider)
-    StreamProviderFactory.register(StreamProtocol.FILE, FileStreamProvider)
+    StreamProviderFactory.register(StreamProtocol.RTSP, _RTSP_STREAM_PROVIDER)
+    StreamProviderFactory.register(StreamProtocol.RTMP, _RTMP_STREAM_PROVIDER)
+    StreamProviderFactory.register(StreamProtocol.HTTP, _HTTP_STREAM_PROVIDER)
+    StreamProviderFactory.register(StreamProtocol.HTTPS, _HTTP_STREAM_PROVIDER)
+    StreamProviderFactory.register(StreamProtocol.FILE, _FILE_STREAM_PROVIDER)
 
 
 # Auto-register on import
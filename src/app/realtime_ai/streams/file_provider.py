@@ -138,7 +138,7 @@ class FileStreamProvider(BaseStreamProvider):
                     await asyncio.sleep(sleep_time)
             
             # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             ret, frame = await loop.run_in_executor(None, self.cap.read)
             
             if not ret or frame is None:
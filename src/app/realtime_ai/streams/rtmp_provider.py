@@ -105,7 +105,7 @@ class RTMPStreamProvider(BaseStreamProvider):
         
         try:
             # Run in executor to avoid blocking
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             ret, frame = await loop.run_in_executor(None, self.cap.read)
             
             if not ret or frame is None:
@@ -59,7 +59,7 @@ class AIService:
             }
         
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             result = await loop.run_in_executor(
                 None, self._detect_sync, image_path
             )
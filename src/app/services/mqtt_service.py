@@ -1,14 +1,38 @@
 """
 MQTT Service for publishing MAVLink data
 """
-import json
 import asyncio
+import os
 import threading
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+import orjson
 import paho.mqtt.client as mqtt
 from loguru import logger
 
+from app.config import settings
+
+
+def _json_default(obj: Any):
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return bytes(obj).hex()
+    raise TypeError
+
+
+# Constant tail of every published envelope, serialized once
+_SOURCE_FIELD = b',"source":"model_control_system"}'
+
+
+def _envelope(field: bytes, data: Any, **extra: Any) -> bytes:
+    """Serialize {"timestamp", <field>: data, **extra, "source"} around pre-encoded constant parts"""
+    parts = [b'{"timestamp":', orjson.dumps(datetime.now().isoformat()),
+             b',"', field, b'":', orjson.dumps(data, default=_json_default)]
+    for key, value in extra.items():
+        parts += (b',"', key.encode(), b'":', orjson.dumps(value))
+    parts.append(_SOURCE_FIELD)
+    return b"".join(parts)
+
 
 class MQTTService:
     """MQTT service for publishing MAVLink data"""
@@ -20,7 +44,8 @@ class MQTTService:
         self.broker_host = "221.226.33.58"  # Your specified MQTT broker IP
         self.broker_port = 1883
         self.topic = "/ue/device/mavlink"
-        self.client_id = f"mavlink_publisher_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Include the pid so workers started in the same second don't share an ID
+        self.client_id = f"mavlink_publisher_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
         
         # Statistics
         self.messages_published = 0
@@ -133,15 +158,8 @@ class MQTTService:
             return False
         
         try:
-            # Prepare message payload
-            payload = {
-                "timestamp": datetime.now().isoformat(),
-                "mavlink_data": mavlink_data,
-                "source": "model_control_system"
-            }
-            
-            # Convert to JSON
-            message = json.dumps(payload, ensure_ascii=False)
+            # Wrap data in the JSON envelope
+            message = _envelope(b"mavlink_data", mavlink_data)
             
             # Publish message
             result = self.client.publish(self.topic, message, qos=1)
@@ -164,15 +182,8 @@ class MQTTService:
             return False
         
         try:
-            # Prepare GPS message payload
-            payload = {
-                "timestamp": datetime.now().isoformat(),
-                "gps_data": gps_data,
-                "source": "model_control_system"
-            }
-            
-            # Convert to JSON
-            message = json.dumps(payload, ensure_ascii=False)
+            # Wrap GPS data in the JSON envelope
+            message = _envelope(b"gps_data", gps_data)
             
             # Publish to GPS topic
             gps_topic = "/ue/device/gps"
@@ -189,6 +200,39 @@ class MQTTService:
             logger.error(f"Error publishing GPS data: {e}")
             return False
     
+    async def publish_gps_batch(self, gps_points: List[Dict[str, Any]], topic: Optional[str] = None):
+        """Publish a batch of GPS points as one message
+        
+        Batches go to their own topic (MQTT_GPS_BATCH_TOPIC by default) so that
+        subscribers of /ue/device/gps keep receiving the per-point gps_data shape.
+        """
+        gps_topic = topic or settings.MQTT_GPS_BATCH_TOPIC
+        if not gps_topic:
+            logger.warning("No MQTT GPS batch topic configured")
+            return False
+        
+        if not self.is_connected or not self.client:
+            logger.warning("MQTT client not connected")
+            return False
+        
+        try:
+            # Wrap the GPS batch in the JSON envelope
+            message = _envelope(b"gps_batch", gps_points, count=len(gps_points))
+            
+            # Publish to the batch topic
+            result = self.client.publish(gps_topic, message, qos=1)
+            
+            if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                logger.debug(f"GPS batch of {len(gps_points)} points queued for MQTT publishing: {gps_topic}")
+                return True
+            else:
+                logger.error(f"Failed to queue GPS batch. Return code: {result.rc}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error publishing GPS batch: {e}")
+            return False
+    
     async def publish_raw_packet(self, packet_data: bytes, client_addr: str):
         """Publish raw MAVLink packet data"""
         if not self.is_connected or not self.client:
@@ -206,7 +250,7 @@ class MQTTService:
             }
             
             # Convert to JSON
-            message = json.dumps(payload, ensure_ascii=False)
+            message = orjson.dumps(payload, default=_json_default)
             
             # Publish message
             result = self.client.publish(self.topic, message, qos=1)
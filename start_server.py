@@ -6,6 +6,7 @@
 自动检测GPU配置
 """
 
+import os
 import uvicorn
 import sys
 from pathlib import Path
@@ -25,7 +26,9 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=2000,
-        reload=True,
+        reload=os.getenv("UVICORN_RELOAD") == "1",
+        workers=int(os.getenv("WORKERS", "1")),
+        http="httptools",
         log_level="info",
         app_dir="src"
     )
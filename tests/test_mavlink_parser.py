@@ -0,0 +1,223 @@
+"""
+MAVLink解析器测试
+"""
+import struct
+
+import pytest
+
+from app.mavlink.mavlink_parser import MavlinkParser
+
+
+def _reference_crc(data: bytes) -> int:
+    """原逐位实现的CRC-16（多项式0x1021，初值0xFFFF，高位优先），用于校验crc_hqx替换"""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ 0x1021
+            else:
+                crc = crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def _v1_frame(message_id: int, payload: bytes, seq: int = 0, system_id: int = 1, component_id: int = 1) -> bytes:
+    """构造MAVLink v1数据帧"""
+    frame = bytes([0xFE, len(payload), seq, system_id, component_id, message_id]) + payload
+    return frame + struct.pack('<H', _reference_crc(frame))
+
+
+def _v2_frame(message_id: int, payload: bytes, seq: int = 0, system_id: int = 1, component_id: int = 1,
+              signature: bytes = b"") -> bytes:
+    """构造MAVLink v2数据帧，传入signature时设置签名标志并追加13字节签名"""
+    incompat_flags = 0x01 if signature else 0x00
+    frame = bytes([0xFD, len(payload), incompat_flags, 0, seq, system_id, component_id]) + \
+        message_id.to_bytes(3, 'little') + payload
+    return frame + struct.pack('<H', _reference_crc(frame)) + signature
+
+
+class TestMavlinkParser:
+    """MAVLink解析器测试类"""
+
+    @pytest.fixture
+    def parser(self):
+        """创建开启CRC校验的解析器"""
+        return MavlinkParser(validate_crc=True)
+
+    def test_calculate_crc_matches_reference(self, parser):
+        """测试crc_hqx与原逐位实现结果一致"""
+        assert parser._calculate_crc(b"123456789") == 0x29B1
+        for data in (b"", b"\x00", b"\xfd\x1c\x00\x00\x07", bytes(range(256))):
+            assert parser._calculate_crc(data) == _reference_crc(data)
+
+    def test_parse_v1_heartbeat(self, parser):
+        """测试解析v1心跳帧"""
+        payload = struct.pack('<BBBIBB', 2, 3, 81, 0x01020304, 4, 3)
+        frame = _v1_frame(0, payload, seq=7, system_id=12, component_id=34)
+
+        result = parser.parse_packet(frame)
+
+        assert result["version"] == 1
+        assert result["message_id"] == 0
+        assert result["sequence"] == 7
+        assert result["system_id"] == 12
+        assert result["component_id"] == 34
+        assert result["parsed_data"] == {
+            "type": 2,
+            "autopilot": 3,
+            "base_mode": 81,
+            "custom_mode": 0x01020304,
+            "system_status": 4,
+            "mavlink_version": 3,
+        }
+        assert result["crc"] == _reference_crc(frame[:-2])
+        assert result["calculated_crc"] == result["crc"]
+        assert result["is_valid"] is True
+
+    def test_parse_v2_attitude(self, parser):
+        """测试解析v2姿态帧：负载从第10字节开始，消息ID为24位"""
+        payload = struct.pack('<Iffffff', 123456, 0.5, -0.25, 1.5, 0.125, -2.0, 4.0)
+        frame = _v2_frame(30, payload, seq=200, system_id=1, component_id=190)
+
+        result = parser.parse_packet(frame)
+
+        assert result["version"] == 2
+        assert result["message_id"] == 30
+        assert result["sequence"] == 200
+        assert result["component_id"] == 190
+        assert result["incompat_flags"] == 0
+        assert result["parsed_data"] == {
+            "time_boot_ms": 123456,
+            "roll": 0.5,
+            "pitch": -0.25,
+            "yaw": 1.5,
+            "rollspeed": 0.125,
+            "pitchspeed": -2.0,
+            "yawspeed": 4.0,
+        }
+        assert result["crc"] == _reference_crc(frame[:-2])
+        assert result["is_valid"] is True
+
+    def test_parse_signed_v2_frame(self, parser):
+        """测试解析带签名的v2帧，签名不影响负载和CRC"""
+        payload = struct.pack('<ffhHff', 12.5, 13.25, 270, 55, 100.5, -0.5)
+        signature = bytes(range(1, 14))
+        frame = _v2_frame(74, payload, seq=3, signature=signature)
+
+        result = parser.parse_packet(frame)
+
+        assert result["incompat_flags"] == 0x01
+        assert result["parsed_data"] == {
+            "airspeed": 12.5,
+            "groundspeed": 13.25,
+            "heading": 270,
+            "throttle": 55,
+            "alt": 100.5,
+            "climb": -0.5,
+        }
+        assert result["crc"] == _reference_crc(frame[:-len(signature) - 2])
+        assert result["is_valid"] is True
+
+    def test_parse_v2_24bit_message_id(self, parser):
+        """测试v2帧的24位消息ID"""
+        parser.add_message_definition(0x012345, "CUSTOM", [("value", "uint16")])
+        frame = _v2_frame(0x012345, struct.pack('<H', 4242))
+
+        result = parser.parse_packet(frame)
+
+        assert result["message_id"] == 0x012345
+        assert result["parsed_data"] == {"value": 4242}
+
+    def test_payload_dropped_when_fully_decoded(self, parser):
+        """测试负载完整解析后不再保留原始字节"""
+        result = parser.parse_packet(_v1_frame(0, bytes(9)))
+
+        assert result["payload"] is None
+
+    def test_truncated_payload_keeps_raw_bytes(self, parser):
+        """测试负载被截断时保留原始字节，已解析的字段照常返回"""
+        payload = struct.pack('<Iff', 123456, 0.5, -0.25)
+        result = parser.parse_packet(_v2_frame(30, payload))
+
+        assert result["payload"] == payload
+        assert result["parsed_data"]["time_boot_ms"] == 123456
+        assert result["parsed_data"]["pitch"] == -0.25
+        assert result["parsed_data"]["yaw"] is None
+
+    def test_unknown_message_keeps_raw_bytes(self, parser):
+        """测试未定义的消息保留原始字节"""
+        payload = b"\x01\x02\x03"
+        result = parser.parse_packet(_v2_frame(250, payload))
+
+        assert result["parsed_data"] == {}
+        assert result["payload"] == payload
+
+    def test_corrupted_frame_fails_crc(self, parser):
+        """测试负载被篡改时CRC校验失败"""
+        frame = bytearray(_v2_frame(30, struct.pack('<Iffffff', 1, 0, 0, 0, 0, 0, 0)))
+        frame[12] ^= 0xFF
+
+        result = parser.parse_packet(bytes(frame))
+
+        assert result["is_valid"] is False
+        assert result["calculated_crc"] != result["crc"]
+
+    def test_crc_validation_disabled(self):
+        """测试关闭CRC校验时不计算CRC"""
+        parser = MavlinkParser(validate_crc=False)
+        frame = bytearray(_v1_frame(0, bytes(9)))
+        frame[-1] ^= 0xFF
+
+        result = parser.parse_packet(bytes(frame))
+
+        assert result["calculated_crc"] is None
+        assert result["is_valid"] is True
+
+    def test_add_message_definition_rejects_unknown_type(self, parser):
+        """测试添加包含未知字段类型的消息定义时报错"""
+        with pytest.raises(ValueError):
+            parser.add_message_definition(200, "BAD", [("name", "char[16]")])
+
+
+class TestAdvancedMavlinkParserPayloads:
+    """高级MAVLink解析器负载解析测试类"""
+
+    @pytest.fixture
+    def parser(self):
+        """创建高级解析器实例"""
+        from app.mavlink.advanced_parser import AdvancedMavlinkParser
+        return AdvancedMavlinkParser()
+
+    def test_parse_vibration(self, parser):
+        """测试VIBRATION：3个浮点振动值和3个uint32削波计数，共32字节"""
+        payload = struct.pack('<QfffIII', 987654321, 0.5, 1.25, -3.0, 7, 8, 9)
+        assert len(payload) == 32
+
+        assert parser._parse_vibration(payload) == {
+            "time_usec": 987654321,
+            "vibration_x": 0.5,
+            "vibration_y": 1.25,
+            "vibration_z": -3.0,
+            "clipping_0": 7,
+            "clipping_1": 8,
+            "clipping_2": 9,
+        }
+
+    def test_parse_battery_status(self, parser):
+        """测试BATTERY_STATUS：36字节负载，10路电芯电压展开后仍能取到末尾字段"""
+        cells = [4100 + i for i in range(10)]
+        payload = struct.pack('<iih10HhBBBb', 1500, 2500, -550, *cells, -120, 0, 1, 2, 87)
+        assert len(payload) == 36
+
+        assert parser._parse_battery_status(payload) == {
+            "current_consumed": 1500,
+            "energy_consumed": 2500,
+            "temperature": -550,
+            "current_battery": -120,
+            "battery_remaining": 87,
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,111 @@
+"""
+MySQL批量队列测试
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.mysql_multi import _BatchQueue
+
+
+class _FakeResult:
+    returns_rows = False
+    rowcount = 1
+
+
+class _FakeConnection:
+    """记录已执行的SQL；blocker未放行前，执行blocking_sql时阻塞"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def execute(self, sql, params):
+        self.engine.started.append(sql)
+        if sql == self.engine.blocking_sql:
+            await self.engine.blocker.wait()
+        self.engine.executed.append(sql)
+        return _FakeResult()
+
+    @asynccontextmanager
+    async def begin(self):
+        yield
+
+
+class _FakeEngine:
+    def __init__(self, blocking_sql=None):
+        self.blocking_sql = blocking_sql
+        self.blocker = asyncio.Event()
+        self.started = []
+        self.executed = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield _FakeConnection(self)
+
+
+async def _wait_until(predicate):
+    for _ in range(100):
+        if predicate():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+
+class TestBatchQueue:
+    """批量队列测试类"""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_result(self):
+        """测试提交SQL后返回执行结果"""
+        engine = _FakeEngine()
+        batch_queue = _BatchQueue(engine)
+
+        assert await batch_queue.submit("UPDATE t SET a = 1") == 1
+        assert engine.executed == ["UPDATE t SET a = 1"]
+
+        await batch_queue.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_is_not_executed(self):
+        """测试调用方取消后，其SQL不再执行"""
+        engine = _FakeEngine(blocking_sql="first")
+        batch_queue = _BatchQueue(engine)
+
+        first = asyncio.create_task(batch_queue.submit("first"))
+        await _wait_until(lambda: engine.started == ["first"])
+
+        second = asyncio.create_task(batch_queue.submit("second"))
+        await asyncio.sleep(0)
+        second.cancel()
+
+        engine.blocker.set()
+        assert await first == 1
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        await asyncio.sleep(0)
+        assert engine.executed == ["first"]
+
+        await batch_queue.close()
+
+    @pytest.mark.asyncio
+    async def test_close_fails_in_flight_and_queued_callers(self):
+        """测试关闭队列时，正在执行和仍在排队的调用方都收到异常而不是一直等待"""
+        engine = _FakeEngine(blocking_sql="in_flight")
+        batch_queue = _BatchQueue(engine)
+
+        in_flight = asyncio.create_task(batch_queue.submit("in_flight"))
+        await _wait_until(lambda: engine.started == ["in_flight"])
+        queued = asyncio.create_task(batch_queue.submit("queued"))
+        await asyncio.sleep(0)
+
+        await batch_queue.close()
+
+        for task in (in_flight, queued):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(task, 1)
+        assert engine.executed == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
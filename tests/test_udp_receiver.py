@@ -0,0 +1,80 @@
+"""
+MAVLink UDP接收器测试
+"""
+import asyncio
+import socket
+import struct
+
+import pytest
+
+from app.mavlink.udp_receiver import MavlinkUdpReceiver
+
+
+def _heartbeat_v2(seq: int, system_id: int = 1) -> bytes:
+    """构造v2心跳帧（CRC不参与UDP接收器的处理）"""
+    payload = struct.pack('<IBBBBB', 0, 2, 3, 81, 4, 3)
+    return bytes([0xFD, len(payload), 0, 0, seq, system_id, 1, 0, 0, 0]) + payload + b"\x00\x00"
+
+
+async def _send_and_wait(receiver: MavlinkUdpReceiver, datagrams: list, expected: int):
+    """向接收器端口发送数据报，等待存储的消息数达到expected"""
+    port = receiver.socket.getsockname()[1]
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for datagram in datagrams:
+            sender.sendto(datagram, ("127.0.0.1", port))
+        for _ in range(200):
+            if len(receiver.messages) >= expected:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        sender.close()
+
+
+class TestMavlinkUdpReceiver:
+    """UDP接收器测试类"""
+
+    @pytest.fixture
+    def receiver(self):
+        """创建绑定到本机随机端口的接收器"""
+        return MavlinkUdpReceiver(host="127.0.0.1", port=0, rcvbuf=0)
+
+    async def _check_receive_path(self, receiver: MavlinkUdpReceiver, expect_transport: bool):
+        # 数据报数量超过单次读取的批量大小，且每个数据报包含两个数据包
+        count = MavlinkUdpReceiver.RECV_BATCH + 10
+        datagrams = [_heartbeat_v2(i % 256, system_id=1 + i % 2) * 2 for i in range(count)]
+
+        await receiver.start()
+        assert (receiver._transport is not None) == expect_transport
+        try:
+            await _send_and_wait(receiver, datagrams, 2 * count)
+        finally:
+            await receiver.stop()
+
+        messages = receiver.get_messages(limit=0)
+        assert len(messages) == 2 * count
+        assert all(message["message_id"] == 0 for message in messages)
+        assert [message["sequence"] for message in messages[:4]] == [0, 0, 1, 1]
+
+        sessions = {session["system_id"]: session for session in receiver.get_sessions()}
+        assert set(sessions) == {1, 2}
+        assert sum(session["message_count"] for session in sessions.values()) == 2 * count
+        assert all(session["client_address"].startswith("127.0.0.1:") for session in sessions.values())
+
+    @pytest.mark.asyncio
+    async def test_receive_with_reader_callback(self, receiver):
+        """测试事件循环读回调路径：接收缓冲区复用后消息内容仍正确"""
+        await self._check_receive_path(receiver, expect_transport=False)
+
+    @pytest.mark.asyncio
+    async def test_receive_with_datagram_endpoint(self, receiver, monkeypatch):
+        """测试事件循环不支持add_reader时（如Windows Proactor）改用数据报端点"""
+        def add_reader(*args):
+            raise NotImplementedError
+
+        monkeypatch.setattr(asyncio.get_running_loop(), "add_reader", add_reader)
+        await self._check_receive_path(receiver, expect_transport=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])